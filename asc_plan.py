@@ -0,0 +1,612 @@
+import gzip
+import os
+import re
+import zipfile
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# CASP BAYPLAN 609: 198 data bytes + CR/LF per line (see casp_file_layout_bayplan609.pdf)
+RECORD_LENGTH = 198
+LINE_LENGTH = 200
+
+# Compressed plans and zipped call packages are read in memory, never extracted to disk.
+# A zip member is addressed as a path below the archive ('calls.zip/PLAN.ASC').
+GZIP_EXTENSION = '.gz'
+ZIP_EXTENSION = '.zip'
+# Zip members taken as plan files (CASP ASC or BAPLIE EDIFACT)
+PLAN_MEMBER_EXTENSIONS = ('.asc', '.edi', '.baplie')
+
+# Bayplan header fields ('$609TSPS/TSB POSEIDON .../POD:PUS/20250320/RECORD=1234/...')
+HEADER_FIELDS: Dict[str, Tuple[int, int]] = {
+    'version': (0, 4),               # {$609}
+    'vessel_code': (4, 8),
+    'vessel_name': (9, 29),
+    'voyage': (30, 42),
+    'user_name': (43, 55),
+    'pod': (60, 63),                 # Port of departure after 'POD:'
+    'date': (64, 72),                # YYYYMMDD
+    'record_count': (80, 84),        # After 'RECORD='
+    'com_voyage': (85, 97),
+    'port_voyage': (98, 110),
+}
+
+# Port rotation header: 18 character prefix followed by up to 50 three-letter port codes
+PORT_ROTATION_PREFIXES = ('PORT ROTATION/', 'OUTBOUND LIST/')
+PORT_ROTATION_START = 18
+PORT_ROTATION_PORTS = 50
+
+# Internal remark index of a container record, referencing the remark section
+REMARK_INDEX_FIELD = (110, 114)
+
+# Sequence number of a container record, repeated at the start of its line in the VGM section
+RECORD_SEQUENCE_FIELD = (177, 182)
+# Trailing sections with one line per container, matched to the records by sequence number
+SEQUENCED_SECTIONS: Dict[str, Tuple[int, int]] = {'VGM remark': (0, 5)}
+
+# Container record bytes that are NUL padded by CASP (place of receipt, number of shifting)
+NUL_PADDED_FIELD = (182, 188)
+
+# Container data fields as 0-based [start, end) slices of a record
+CONTAINER_FIELDS: Dict[str, Tuple[int, int]] = {
+    'Slot': (0, 6),                  # BAY+ROW+TIER (1-6 position)
+    'Container Number': (7, 19),     # 8-19 position
+    'Operator Code': (19, 22),       # 20-22 position
+    'Port Of Origin': (22, 27),      # 23-27 position
+    'POL': (27, 30),                 # 28-30 position
+    'POD': (30, 33),                 # 31-33 position
+    'Destination': (39, 44),         # 40-44 position, MSC final POD
+    'Container Type': (44, 48),      # 45-48 position
+    'Raw Weight': (48, 51),          # 49-51 position, 100 kg units
+    'Full/Empty': (51, 52),          # 52 position
+    'IMDG Index': (60, 64),          # 61-64 position
+    'OOG Dimensions': (92, 107),     # 93-107 position, 5 x 3 characters
+}
+
+# Slot position decoded as numbers ('011286' = bay 01, row 12, tier 86)
+SLOT_FIELDS: Dict[str, Tuple[int, int]] = {
+    'Bay': (0, 2),
+    'Row': (2, 4),
+    'Tier': (4, 6),
+}
+
+# Over dimensions in centimeters, decoded as numbers (blank = 0)
+OOG_FIELDS: Dict[str, Tuple[int, int]] = {
+    'Over Height': (92, 95),         # 93-95 position
+    'Over Front': (95, 98),          # 96-98 position, foreward
+    'Over Back': (98, 101),          # 99-101 position, aftward
+    'Over Left': (101, 104),         # 102-104 position, port
+    'Over Right': (104, 107),        # 105-107 position, starboard
+}
+
+# Columns of the duplicate container / slot conflict report
+DUPLICATE_COLUMNS = ['Issue', 'Key', 'Line', 'Container Number', 'Slot', 'Lines']
+
+# '***Refer to the following IMDG.' section lines
+IMDG_FIELDS: Dict[str, Tuple[int, int]] = {
+    'IMDG Index': (0, 4),            # Internal IMDG index referenced by container records
+    'Sub Index': (4, 6),
+    'Raw Class': (6, 8),             # {31} = Class 3.1
+    'UN Number': (8, 12),
+    'Raw Net Weight': (12, 17),      # kg, {12345} = 12.35 tons
+    'Subsidiary Risk 1': (17, 19),
+    'Subsidiary Risk 2': (19, 21),
+    'Subsidiary Risk 3': (21, 23),
+    'Packing Group': (23, 25),
+    'Acceptance No': (25, 32),
+    'Excepted Quantity': (32, 33),
+    'DG Cargo Type': (33, 39),
+    'Limited Quantity': (39, 40),
+    'Co-Loaded': (40, 41),
+    'Marine Pollutant': (41, 42),
+    'OBL Index': (144, 148),
+    'Flash Point': (148, 152),
+    'Remark': (152, 198),
+}
+
+# '***Refer to the following remark.' section lines
+REMARK_FIELDS: Dict[str, Tuple[int, int]] = {
+    'Remark Index': (0, 4),
+    'Text': (5, 75),
+    '1st BN Container': (78, 90),
+    '2nd BN Container': (91, 103),
+    '3rd BN Container': (104, 116),
+    '4th BN Container': (117, 129),
+    'Break Bulk': (130, 133),        # '*BB'
+    'BB Length': (138, 142),
+    'BB Breadth': (143, 147),
+    'BB Height': (148, 152),
+    'Substance': (153, 158),
+}
+
+
+def _to_matrix(data: bytes) -> np.ndarray:
+    """Convert raw file contents to an (n, RECORD_LENGTH) uint8 matrix, one row per line"""
+    if len(data) % LINE_LENGTH == 0 and data[RECORD_LENGTH:LINE_LENGTH] == b'\r\n':
+        # Well-formed file: every line is exactly one record, no copy needed
+        return np.frombuffer(data, dtype=np.uint8).reshape(-1, LINE_LENGTH)[:, :RECORD_LENGTH]
+
+    lines = data.splitlines()
+    padded = b''.join(line[:RECORD_LENGTH].ljust(RECORD_LENGTH) for line in lines)
+    return np.frombuffer(padded, dtype=np.uint8).reshape(-1, RECORD_LENGTH)
+
+
+def split_archive_path(file_path: str) -> Tuple[str, Optional[str]]:
+    """'calls.zip/PLAN.ASC' -> ('calls.zip', 'PLAN.ASC'); other paths -> (file_path, None)"""
+    normalized = file_path.replace('\\', '/')
+    start = 0
+    while True:
+        index = normalized.lower().find(ZIP_EXTENSION + '/', start)
+        if index < 0:
+            return file_path, None
+        end = index + len(ZIP_EXTENSION)
+        if os.path.isfile(file_path[:end]):
+            return file_path[:end], normalized[end + 1:]
+        start = end
+
+
+def list_archive_plans(archive_path: str) -> List[str]:
+    """Paths of the plan members of a zip archive, in archive order"""
+    with zipfile.ZipFile(archive_path) as archive:
+        members = [info.filename for info in archive.infolist()
+                   if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+                   and info.filename.lower().endswith(PLAN_MEMBER_EXTENSIONS)]
+    return [f'{archive_path}/{member}' for member in members]
+
+
+def is_archive(file_path: str) -> bool:
+    """True for a zip archive of plan files"""
+    return file_path.lower().endswith(ZIP_EXTENSION) and os.path.isfile(file_path)
+
+
+def plan_stem(file_path: str) -> str:
+    """
+    Output path stem of a plan file
+
+    'x/PLAN.ASC' -> 'x/PLAN', 'x/PLAN.ASC.gz' -> 'x/PLAN' and zip members go next
+    to the archive: 'x/calls.zip/a/PLAN.ASC' -> 'x/calls_PLAN'
+    """
+    archive_path, member = split_archive_path(file_path)
+    if member is not None:
+        archive_stem = os.path.splitext(archive_path)[0]
+        return f'{archive_stem}_{plan_stem(member.rsplit("/", 1)[-1])}'
+    if file_path.lower().endswith(GZIP_EXTENSION):
+        file_path = file_path[:-len(GZIP_EXTENSION)]
+    return os.path.splitext(file_path)[0]
+
+
+@contextmanager
+def open_plan_file(file_path: str) -> Iterator[BinaryIO]:
+    """Open a plain, gzip compressed or zip member plan file as a binary stream"""
+    archive_path, member = split_archive_path(file_path)
+    if member is not None:
+        with zipfile.ZipFile(archive_path) as archive, archive.open(member) as stream:
+            yield stream
+    elif file_path.lower().endswith(GZIP_EXTENSION):
+        with gzip.open(file_path, 'rb') as stream:
+            yield stream
+    else:
+        with open(file_path, 'rb') as stream:
+            yield stream
+
+
+def plan_file_size(file_path: str) -> int:
+    """Uncompressed size of a plan file in bytes"""
+    archive_path, member = split_archive_path(file_path)
+    if member is not None:
+        with zipfile.ZipFile(archive_path) as archive:
+            return archive.getinfo(member).file_size
+    if file_path.lower().endswith(GZIP_EXTENSION):
+        # ISIZE trailer of the gzip stream: uncompressed size modulo 2**32
+        with open(file_path, 'rb') as f:
+            f.seek(-4, os.SEEK_END)
+            return int.from_bytes(f.read(4), 'little')
+    return os.path.getsize(file_path)
+
+
+def read_matrix(file_path: str) -> np.ndarray:
+    """Read an ASC file (plain, gzip compressed or zip member) into a fixed-width uint8 matrix"""
+    with open_plan_file(file_path) as f:
+        return _to_matrix(f.read())
+
+
+def slice_field(matrix: np.ndarray, start: int, end: int) -> np.ndarray:
+    """Slice one fixed-width field out of every row and return it as stripped strings"""
+    width = end - start
+    block = matrix[:, start:end]
+    # NUL padding reads as blank, non-ASCII bytes as '?'
+    block = np.where(block == 0, ord(' '), np.where(block > 127, ord('?'), block)).astype(np.uint8)
+    column = np.ascontiguousarray(block).view(f'S{width}').ravel()
+    return np.char.strip(column.astype(f'U{width}'))
+
+
+def numeric_field(matrix: np.ndarray, start: int, end: int) -> np.ndarray:
+    """Decode a right-aligned digit field of every row as integers, blanks and other characters count as 0"""
+    digits = matrix[:, start:end].astype(np.int64) - ord('0')
+    digits[(digits < 0) | (digits > 9)] = 0
+    return digits @ (10 ** np.arange(end - start - 1, -1, -1))
+
+
+def _decode_fields(matrix: np.ndarray, rows: np.ndarray, fields: Dict[str, Tuple[int, int]]) -> pd.DataFrame:
+    """Decode the given rows into a DataFrame with a 1-based 'Line' column and one column per field"""
+    selected = matrix[rows]
+    df = pd.DataFrame({'Line': rows + 1})
+    for name, (start, end) in fields.items():
+        df[name] = slice_field(selected, start, end)
+    return df
+
+
+class PlanHeader:
+    """Vessel, voyage and record count from the '$' header lines of an ASC file"""
+
+    def __init__(self, version: str = '', vessel_code: str = '', vessel_name: str = '', voyage: str = '',
+                 user_name: str = '', pod: str = '', date: str = '', record_count: Optional[int] = None,
+                 com_voyage: str = '', port_voyage: str = '', port_rotation: List[str] = None):
+        self.version = version
+        self.vessel_code = vessel_code
+        self.vessel_name = vessel_name
+        self.voyage = voyage
+        self.user_name = user_name
+        self.pod = pod
+        self.date = date
+        self.record_count = record_count
+        self.com_voyage = com_voyage
+        self.port_voyage = port_voyage
+        self.port_rotation = port_rotation or []
+
+    def as_dict(self) -> Dict[str, object]:
+        """Header fields with display names, for the Plan Info sheet"""
+        return {
+            'Version': self.version,
+            'Vessel Code': self.vessel_code,
+            'Vessel Name': self.vessel_name,
+            'Voyage': self.voyage,
+            'POD': self.pod,
+            'Date': self.date,
+            'Declared Records': self.record_count,
+            'Port Rotation': ' '.join(self.port_rotation),
+        }
+
+
+def parse_header(header_lines: List[str]) -> PlanHeader:
+    """Parse the bayplan header and port rotation lines"""
+    header = PlanHeader()
+    for line in header_lines:
+        if line[4:PORT_ROTATION_START] in PORT_ROTATION_PREFIXES:
+            rotation = line[PORT_ROTATION_START:PORT_ROTATION_START + 3 * PORT_ROTATION_PORTS]
+            header.port_rotation = [port for port in (rotation[i:i + 3].strip()
+                                                      for i in range(0, len(rotation), 3)) if port]
+        elif 'RECORD=' in line:
+            line = line.ljust(RECORD_LENGTH)
+            for name, (start, end) in HEADER_FIELDS.items():
+                setattr(header, name, line[start:end].strip())
+            match = re.search(r'RECORD=\s*(\d+)', line)
+            header.record_count = int(match.group(1)) if match else None
+    return header
+
+
+def rotation_rank(ports: pd.Series, rotation: List[str]) -> np.ndarray:
+    """
+    Rank port codes by their position in the port rotation
+
+    Ports missing from the rotation (or all ports when the rotation header is
+    empty) are ranked after it in order of first appearance.
+    """
+    order = {port: rank for rank, port in enumerate(dict.fromkeys(rotation))}
+    for port in pd.unique(ports):
+        order.setdefault(port, len(order))
+    return ports.map(order).to_numpy()
+
+
+def preflight_check(file_path: str) -> List[str]:
+    """
+    Check file integrity from the header lines and the file size only
+
+    Reads the first lines and the bytes around the end of the declared container
+    block, so truncated or NUL padded uploads are rejected before a full run.
+
+    Args:
+        file_path: Path to ASC file
+
+    Returns:
+        List of integrity errors, empty if the file looks complete
+    """
+    problems = []
+    file_size = plan_file_size(file_path)
+    # Compressed streams seek by decompressing, which stays cheap for plan sized files
+    with open_plan_file(file_path) as f:
+        head = f.read(LINE_LENGTH * 4)
+        if not head.startswith(b'$'):
+            return ['Missing $ bayplan header']
+        if file_size >= LINE_LENGTH:
+            f.seek(file_size - LINE_LENGTH)
+            tail = f.read(LINE_LENGTH)
+            if tail.endswith(b'\x00' * 8):
+                problems.append('File ends with NUL padding (incomplete upload)')
+
+        # Only fixed-length CR/LF files can be checked by offset
+        if head[RECORD_LENGTH:LINE_LENGTH] != b'\r\n':
+            return problems
+        if file_size % LINE_LENGTH not in (0, RECORD_LENGTH):
+            problems.append(f'File size {file_size:,} bytes is not a whole number of {LINE_LENGTH}-byte lines')
+
+        header_lines = [line.decode('ascii', errors='replace') for line in head.split(b'\r\n')]
+        header_count = next((i for i, line in enumerate(header_lines) if not line.startswith('$')),
+                            len(header_lines))
+        header = parse_header(header_lines[:header_count])
+        if header.record_count is None:
+            problems.append('Header has no RECORD= container count')
+            return problems
+
+        # The line after the declared records must start a section or end the file
+        end_offset = (header_count + header.record_count) * LINE_LENGTH
+        if end_offset > file_size:
+            lines_in_file = -(-file_size // LINE_LENGTH)
+            problems.append(f'Header declares {header.record_count:,} records but the file holds only '
+                            f'{max(lines_in_file - header_count, 0):,} lines after the header (truncated)')
+        elif end_offset < file_size:
+            f.seek(end_offset)
+            if f.read(3) != b'***':
+                problems.append(f'Line {header_count + header.record_count + 1} after the declared '
+                                f'{header.record_count:,} records is not a section line (record count mismatch)')
+    return problems
+
+
+def _section_name(title: str) -> str:
+    """'***Refer to the following IMDG.' -> 'IMDG'"""
+    name = title.lstrip('*').strip().rstrip('.')
+    prefix = 'Refer to the following '
+    return name[len(prefix):] if name.startswith(prefix) else name
+
+
+def decode_imdg(matrix: np.ndarray, rows: np.ndarray) -> pd.DataFrame:
+    """Decode IMDG detail lines; 'Class' is returned as '5.1' and net weight in tons"""
+    df = _decode_fields(matrix, rows, IMDG_FIELDS)
+    df = df[df['IMDG Index'] != ''].reset_index(drop=True)
+    raw_class = df['Raw Class']
+    df['Class'] = np.where(raw_class.str.len() == 2, raw_class.str[0] + '.' + raw_class.str[1], raw_class)
+    # Net weight is given in kg ("12345" = 12.35T)
+    df['Net Weight'] = pd.to_numeric(df['Raw Net Weight'], errors='coerce').fillna(0) / 1000
+    return df
+
+
+def decode_remarks(matrix: np.ndarray, rows: np.ndarray) -> pd.DataFrame:
+    """Decode special remark lines with their bundled container and break bulk fields"""
+    df = _decode_fields(matrix, rows, REMARK_FIELDS)
+    df = df[df['Remark Index'] != ''].reset_index(drop=True)
+    bundle_columns = ['1st BN Container', '2nd BN Container', '3rd BN Container', '4th BN Container']
+    df['Bundled Containers'] = df[bundle_columns].apply(lambda cnos: '/'.join(c for c in cnos if c), axis=1) \
+        if len(df) else pd.Series(dtype=str)
+    return df.drop(columns=bundle_columns)
+
+
+def decode_section(name: str, matrix: np.ndarray, rows: np.ndarray) -> pd.DataFrame:
+    """Decode the lines of a trailing section by its name, unknown sections keep the raw text"""
+    if name == 'IMDG':
+        return decode_imdg(matrix, rows)
+    if name == 'remark':
+        return decode_remarks(matrix, rows)
+    df = _decode_fields(matrix, rows, {'Text': (0, RECORD_LENGTH)})
+    return df[df['Text'] != ''].reset_index(drop=True)
+
+
+def find_duplicates(records: pd.DataFrame) -> pd.DataFrame:
+    """
+    Find container numbers that appear more than once and slots claimed by several records
+
+    A 40' box in an even bay also claims the 20' slots of the bays on either
+    side, so it conflicts with 20' boxes stowed there in the same row and tier.
+
+    Args:
+        records: Container records with 'Line', 'Container Number', 'Slot' and numeric 'Bay', 'Row', 'Tier'
+
+    Returns:
+        DataFrame with one row per record involved: Issue ('Duplicate container'
+        or 'Slot conflict'), the duplicated Key, the record's Line and all Lines
+        sharing the key
+    """
+    numbers = records['Container Number']
+    is_duplicate = (numbers.duplicated(keep=False) & (numbers != '')).to_numpy()
+    duplicates = pd.DataFrame({'Issue': 'Duplicate container', 'Key': numbers.to_numpy()[is_duplicate],
+                               'Record': np.flatnonzero(is_duplicate)})
+
+    # Every record claims its 20' slots, keyed as BBRRTT numbers
+    bays = records['Bay'].to_numpy()
+    placed = np.flatnonzero(bays > 0)
+    forty = placed[bays[placed] % 2 == 0]
+    claim_records = np.concatenate([placed, forty])
+    claim_bays = np.concatenate([np.where(bays[placed] % 2 == 0, bays[placed] - 1, bays[placed]), bays[forty] + 1])
+    claim_keys = (claim_bays * 10000 + records['Row'].to_numpy()[claim_records] * 100
+                  + records['Tier'].to_numpy()[claim_records])
+    is_conflict = pd.Series(claim_keys).duplicated(keep=False).to_numpy()
+    conflicts = pd.DataFrame({'Issue': 'Slot conflict',
+                              'Key': [f'{key:06d}' for key in claim_keys[is_conflict]],
+                              'Record': claim_records[is_conflict]})
+
+    report = pd.concat([duplicates, conflicts], ignore_index=True).drop_duplicates()
+    report['Line'] = records['Line'].to_numpy()[report['Record'].to_numpy(dtype=np.int64)]
+    report['Container Number'] = numbers.to_numpy()[report['Record'].to_numpy(dtype=np.int64)]
+    report['Slot'] = records['Slot'].to_numpy()[report['Record'].to_numpy(dtype=np.int64)]
+    report = report.sort_values(['Issue', 'Key', 'Line'], ignore_index=True)
+    lines = report.assign(Lines=report['Line'].astype(str)).groupby(['Issue', 'Key'], sort=False)['Lines'].agg(', '.join)
+    report = report.join(lines, on=['Issue', 'Key'])
+    return report[DUPLICATE_COLUMNS]
+
+
+class AscPlan:
+    """ASC bay plan split into header lines, container records and trailing sections"""
+
+    def __init__(self, header_lines: List[str], records: pd.DataFrame, sections: Dict[str, pd.DataFrame],
+                 header: PlanHeader = None, nul_anomalies: int = 0,
+                 section_rows: Dict[str, Tuple[int, np.ndarray]] = None):
+        self.header_lines = header_lines
+        self.header = header or parse_header(header_lines)
+        self.records = records
+        self.sections = sections
+        self.nul_anomalies = nul_anomalies
+        # Section name -> (title row, content rows) as 0-based matrix rows
+        self.section_rows = section_rows or {}
+        self._duplicates = None
+
+    @property
+    def declared_records(self) -> Optional[int]:
+        """Container count declared by the 'RECORD=' header field"""
+        return self.header.record_count
+
+    @property
+    def duplicates(self) -> pd.DataFrame:
+        """Duplicate container numbers and slot conflicts of the records (find_duplicates)"""
+        if self._duplicates is None:
+            self._duplicates = find_duplicates(self.records)
+        return self._duplicates
+
+    def integrity_issues(self) -> List[str]:
+        """Compare the header with the records actually read"""
+        issues = []
+        if self.declared_records is None:
+            issues.append('Header has no RECORD= container count')
+        elif self.declared_records != len(self.records):
+            issues.append(f'Header declares {self.declared_records:,} records, {len(self.records):,} read')
+        if self.nul_anomalies:
+            issues.append(f'{self.nul_anomalies:,} container records contain unexpected NUL bytes')
+        for issue, count in self.duplicates.groupby('Issue', sort=True)['Key'].nunique().items():
+            issues.append(f'{count:,} x {issue} (see Duplicates sheet)')
+        return issues
+
+    @property
+    def imdg(self) -> pd.DataFrame:
+        """Decoded '***Refer to the following IMDG.' section"""
+        return self.sections.get('IMDG', decode_imdg(np.empty((0, RECORD_LENGTH), np.uint8), np.arange(0)))
+
+    @property
+    def remarks(self) -> pd.DataFrame:
+        """Decoded '***Refer to the following remark.' section"""
+        return self.sections.get('remark', decode_remarks(np.empty((0, RECORD_LENGTH), np.uint8), np.arange(0)))
+
+
+def parse_plan(matrix: np.ndarray) -> AscPlan:
+    """
+    Split a fixed-width matrix into the sections of an ASC file
+
+    The container scan stops at the count declared in the 'RECORD=' header
+    when the line after it starts a section (or ends the file); otherwise it
+    falls back to the first '***' section line.
+    """
+    first_char = matrix[:, 0]
+    is_header = first_char == ord('$')
+    header_count = int(np.argmin(is_header)) if not is_header.all() else len(matrix)
+    header_lines = [bytes(row).decode('ascii', errors='replace').rstrip() for row in matrix[:header_count]]
+    header = parse_header(header_lines)
+    declared = header.record_count
+
+    end = header_count + declared if declared is not None else -1
+    if not (header_count <= end <= len(matrix) and (end == len(matrix) or first_char[end] == ord('*'))):
+        section_starts = np.flatnonzero(first_char[header_count:] == ord('*'))
+        end = header_count + int(section_starts[0]) if len(section_starts) else len(matrix)
+
+    records = _decode_fields(matrix, np.arange(header_count, end), CONTAINER_FIELDS)
+    # NUL bytes are only expected in the NUL padded field
+    is_nul = matrix[header_count:end] == 0
+    is_nul[:, NUL_PADDED_FIELD[0]:NUL_PADDED_FIELD[1]] = False
+    nul_anomalies = int(is_nul.any(axis=1).sum())
+    # Weight is given in units of 100 kg ("123" = 12.3T)
+    records['Weight'] = pd.to_numeric(records['Raw Weight'], errors='coerce').fillna(0) / 10
+    container_rows = matrix[header_count:end]
+    for name, (start, end_column) in {**SLOT_FIELDS, **OOG_FIELDS}.items():
+        records[name] = numeric_field(container_rows, start, end_column)
+
+    # Trailing sections start with '***Refer to the following ...' title lines
+    is_title = (matrix[end:, :3] == ord('*')).all(axis=1)
+    titles = end + np.flatnonzero(is_title)
+    sections = {}
+    section_rows = {}
+    for title_row, next_row in zip(titles, list(titles[1:]) + [len(matrix)]):
+        title = bytes(matrix[title_row]).decode('ascii', errors='replace').strip()
+        name = _section_name(title)
+        section_rows[name] = (int(title_row), np.arange(title_row + 1, next_row))
+        sections[name] = decode_section(name, matrix, section_rows[name][1])
+
+    return AscPlan(header_lines, records, sections, header, nul_anomalies, section_rows)
+
+
+def read_plan(file_path: str) -> AscPlan:
+    """Read an ASC file with its header, container records and trailing sections"""
+    return parse_plan(read_matrix(file_path))
+
+
+def read_records(file_path: str) -> pd.DataFrame:
+    """
+    Read every container record of an ASC file into a columnar DataFrame
+
+    Args:
+        file_path: Path to ASC file
+
+    Returns:
+        DataFrame with one row per container record, a 1-based 'Line' column and
+        one string column per entry of CONTAINER_FIELDS plus a numeric 'Weight' in tons
+        with the numeric SLOT_FIELDS and the OOG_FIELDS over dimensions in centimeters
+    """
+    return read_plan(file_path).records
+
+
+def write_filtered_plan(source_path: str, output_path: str, keep_lines: Iterable[int]) -> Tuple[int, List[str]]:
+    """
+    Write a copy of an ASC file with only the given container records
+
+    Retained lines are copied byte for byte from the source; only the
+    'RECORD=' count of the header changes. IMDG and remark lines are kept when
+    a retained container references their index. Lines of the SEQUENCED_SECTIONS
+    (VGM remarks) are kept when their sequence number is that of a retained
+    container. Other sections are copied unchanged.
+
+    Args:
+        source_path: ASC file to filter
+        output_path: ASC file to write
+        keep_lines: 1-based line numbers ('Line' column) of the container records to keep
+
+    Returns:
+        Tuple of the number of container records written and the names of the
+        sections copied unchanged although records were left out
+    """
+    matrix = read_matrix(source_path)
+    plan = parse_plan(matrix)
+    lines = plan.records['Line'].to_numpy()
+    keep = np.isin(lines, np.fromiter(keep_lines, dtype=np.int64))
+    container_rows = lines[keep] - 1
+
+    header = matrix[:len(plan.header_lines)].copy()
+    for row in header:
+        match = re.search(rb'RECORD=(\d+)', row.tobytes())
+        if match:
+            start, end = match.span(1)
+            row[start:end] = np.frombuffer(str(len(container_rows)).zfill(end - start).encode('ascii'), np.uint8)
+
+    referenced = {
+        'IMDG': set(plan.records['IMDG Index'].to_numpy()[keep]) - {''},
+        'remark': set(slice_field(matrix[container_rows], *REMARK_INDEX_FIELD)) - {''},
+    }
+    sequences = slice_field(matrix[lines - 1], *RECORD_SEQUENCE_FIELD)
+    # Sequence numbers only identify the records when every record has a distinct one
+    has_sequences = '' not in sequences and len(np.unique(sequences)) == len(sequences)
+    rows = [container_rows]
+    unfiltered = []
+    for name, (title_row, section_rows) in plan.section_rows.items():
+        if name in referenced:
+            section_rows = section_rows[np.isin(slice_field(matrix[section_rows], 0, 4), list(referenced[name]))]
+        elif name in SEQUENCED_SECTIONS and has_sequences:
+            section_rows = section_rows[np.isin(slice_field(matrix[section_rows], *SEQUENCED_SECTIONS[name]),
+                                                sequences[keep])]
+        elif len(section_rows) and not keep.all():
+            unfiltered.append(name)
+        rows.append(np.concatenate([[title_row], section_rows]))
+    body_rows = np.concatenate(rows).astype(np.int64)
+
+    # Assemble fixed 200-byte lines: record bytes plus CR/LF
+    output = np.empty((len(header) + len(body_rows), LINE_LENGTH), dtype=np.uint8)
+    output[:len(header), :RECORD_LENGTH] = header
+    output[len(header):, :RECORD_LENGTH] = matrix[body_rows]
+    output[:, RECORD_LENGTH:] = np.frombuffer(b'\r\n', np.uint8)
+    with open(output_path, 'wb') as f:
+        f.write(output.tobytes())
+    return len(container_rows), unfiltered
@@ -0,0 +1,237 @@
+import numpy as np
+import pandas as pd
+from typing import BinaryIO, Iterator, List
+
+from asc_plan import (CONTAINER_FIELDS, OOG_FIELDS, RECORD_LENGTH, SLOT_FIELDS, AscPlan, PlanHeader, decode_imdg,
+                      open_plan_file)
+
+# Default UN/EDIFACT service characters, overridden by a UNA segment
+DEFAULT_SEPARATORS = {'component': ':', 'element': '+', 'release': '?', 'segment': "'"}
+
+# Bytes read per chunk from the stream
+CHUNK_SIZE = 1 << 20
+
+# Full/empty status of EQD (5 = full, 4 = empty)
+FULL_EMPTY_CODES = {'5': 'F', '4': 'E'}
+
+# LOC qualifiers of a container group and the record column they fill
+LOCATION_COLUMNS = {
+    '9': 'POL',                  # Place/port of loading
+    '11': 'POD',                 # Place/port of discharge
+    '76': 'Port Of Origin',      # Original port of loading
+    '83': 'Destination',         # Place of delivery
+}
+
+# DIM qualifiers of over dimensions and the component holding the value (length:width:height)
+DIMENSION_COLUMNS = {
+    '5': ('Over Front', 1),
+    '6': ('Over Back', 1),
+    '7': ('Over Right', 2),
+    '8': ('Over Left', 2),
+    '9': ('Over Height', 3),
+}
+
+# Weight units to tons
+WEIGHT_UNITS = {'KGM': 0.001, 'TNE': 1.0, 'LBR': 0.00045359237}
+# Length units to centimeters
+LENGTH_UNITS = {'CMT': 1.0, 'MMT': 0.1, 'MTR': 100.0, 'INH': 2.54}
+
+
+def is_edifact(file_path: str) -> bool:
+    """True if the file starts with a UNA or UNB service segment"""
+    with open_plan_file(file_path) as f:
+        head = f.read(64).lstrip()
+    return head.startswith(b'UNA') or head.startswith(b'UNB')
+
+
+def _split(text: str, separator: str, release: str, unescape: bool = True) -> List[str]:
+    """
+    Split on a separator that is not escaped with the release character
+
+    With unescape=False the release characters are kept, so the parts can be
+    split again on another separator.
+    """
+    if release not in text:
+        return text.split(separator)
+    parts, current, escaped = [], [], False
+    for char in text:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == release:
+            escaped = True
+            if not unescape:
+                current.append(char)
+        elif char == separator:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return parts
+
+
+def iter_segments(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[List[List[str]]]:
+    """
+    Tokenize an EDIFACT interchange from a byte stream
+
+    The stream is read in chunks; segments cut by a chunk boundary are carried
+    over to the next chunk, so memory stays bounded for large files.
+
+    Yields:
+        Segments as lists of elements, each element a list of components;
+        segment[0][0] is the tag ('LOC', 'EQD', ...)
+    """
+    separators = dict(DEFAULT_SEPARATORS)
+    # The first read always covers the 9-byte UNA service string advice
+    buffer = stream.read(max(chunk_size, 64))
+    if buffer.lstrip().startswith(b'UNA'):
+        buffer = buffer.lstrip()
+        una = buffer[3:9].decode('latin-1')
+        separators = {'component': una[0], 'element': una[1], 'release': una[3], 'segment': una[5]}
+        buffer = buffer[9:]
+
+    terminator = separators['segment'].encode('latin-1')
+    release = separators['release']
+    release_byte = release.encode('latin-1')
+    while buffer:
+        chunk = stream.read(chunk_size)
+        pieces = buffer.split(terminator)
+        # The last piece is incomplete unless the stream has ended
+        buffer = pieces.pop() if chunk else b''
+
+        pending = b''
+        for piece in pieces:
+            piece = pending + piece
+            # A terminator preceded by an odd number of release characters is data
+            if piece.endswith(release_byte) and (len(piece) - len(piece.rstrip(release_byte))) % 2:
+                pending = piece + terminator
+                continue
+            pending = b''
+            text = piece.decode('latin-1').strip()
+            if text:
+                yield [_split(element, separators['component'], release)
+                       for element in _split(text, separators['element'], release, unescape=False)]
+        buffer = pending + buffer + chunk
+
+
+def _component(segment: List[List[str]], element: int, component: int = 0) -> str:
+    """Component of a segment, '' when missing"""
+    if element < len(segment) and component < len(segment[element]):
+        return segment[element][component].strip()
+    return ''
+
+
+def _port_code(locode: str) -> str:
+    """Three letter port code of a UN/LOCODE, as used by the ASC POL/POD fields ('KRPUS' -> 'PUS')"""
+    return locode[2:5] if len(locode) == 5 else locode
+
+
+def _slot(cell: str) -> str:
+    """ASC slot 'BBRRTT' of a BAPLIE stowage cell ('0010286' = bay 001, row 02, tier 86)"""
+    if len(cell) == 7 and cell.isdigit():
+        bay = int(cell[:3])
+        return (f'{bay:02d}' if bay < 100 else str(bay)) + cell[3:]
+    return cell
+
+
+def parse_baplie(stream: BinaryIO) -> AscPlan:
+    """
+    Read a BAPLIE 2.x or 3.x message into the ASC record model
+
+    Every LOC+147 (stowage cell) starts a container; its EQD, NAD, LOC, MEA,
+    DIM and DGS segments fill the same columns asc_plan.parse_plan produces.
+    'Line' is the segment number of the LOC+147 segment and DG goods get
+    sequential IMDG indexes joined to the IMDG section.
+    """
+    header = PlanHeader()
+    header_lines = []
+    containers = []
+    dangerous_goods = []
+    container = None
+
+    for number, segment in enumerate(iter_segments(stream), 1):
+        tag = segment[0][0]
+        qualifier = _component(segment, 1)
+
+        if tag == 'LOC' and qualifier == '147':
+            container = {'Line': number, 'Slot': _slot(_component(segment, 2))}
+            containers.append(container)
+        elif tag in ('UNT', 'UNZ', 'CNT'):
+            container = None
+        elif container is None:
+            # Message header segments
+            header_lines.append('+'.join(':'.join(element) for element in segment))
+            if tag == 'UNH':
+                header.version = ' '.join(filter(None, segment[2][:3])) if len(segment) > 2 else 'BAPLIE'
+            elif tag == 'TDT':
+                header.voyage = _component(segment, 2)
+                header.vessel_code = _component(segment, 8)
+                header.vessel_name = _component(segment, 8, 3)
+            elif tag == 'LOC' and qualifier in ('5', '61'):
+                port = _port_code(_component(segment, 2))
+                if qualifier == '5':
+                    header.pod = port
+                header.port_rotation.append(port)
+            elif tag == 'DTM' and _component(segment, 1) in ('178', '136', '137') and not header.date:
+                header.date = _component(segment, 1, 1)[:8]
+        elif tag == 'EQD':
+            container['Container Number'] = _component(segment, 2).replace(' ', '')
+            container['Container Type'] = _component(segment, 3)
+            container['Full/Empty'] = FULL_EMPTY_CODES.get(_component(segment, 6), '')
+        elif tag == 'NAD' and qualifier in ('CA', 'CF'):
+            container['Operator Code'] = _component(segment, 2)
+        elif tag == 'LOC' and qualifier in LOCATION_COLUMNS:
+            locode = _component(segment, 2)
+            column = LOCATION_COLUMNS[qualifier]
+            container[column] = _port_code(locode) if column in ('POL', 'POD') else locode
+        elif tag == 'MEA':
+            # 2.x: MEA+WT++KGM:20500, 3.x: MEA+AAE+VGM+KGM:20500 (VGM preferred over gross weight)
+            measure = _component(segment, 2)
+            if qualifier in ('WT', 'VGM') or (qualifier == 'AAE' and measure in ('AET', 'VGM', 'G')):
+                if 'Weight' not in container or measure == 'VGM':
+                    value = pd.to_numeric(_component(segment, 3, 1), errors='coerce')
+                    unit = WEIGHT_UNITS.get(_component(segment, 3), 0.001)
+                    container['Weight'] = 0.0 if pd.isna(value) else round(value * unit, 3)
+        elif tag == 'DIM' and qualifier in DIMENSION_COLUMNS:
+            column, component = DIMENSION_COLUMNS[qualifier]
+            value = pd.to_numeric(_component(segment, 2, component), errors='coerce')
+            unit = LENGTH_UNITS.get(_component(segment, 2), 1.0)
+            if not pd.isna(value):
+                container[column] = int(round(value * unit))
+        elif tag == 'DGS':
+            if not container.get('IMDG Index'):
+                container['IMDG Index'] = f'{len(dangerous_goods) + 1:04d}'
+            dangerous_goods.append({
+                'Line': number,
+                'IMDG Index': container['IMDG Index'],
+                'Class': _component(segment, 2),
+                'UN Number': _component(segment, 3),
+            })
+
+    columns = ['Line'] + list(CONTAINER_FIELDS)
+    records = pd.DataFrame(containers, columns=columns + ['Weight'] + list(OOG_FIELDS))
+    records[columns[1:]] = records[columns[1:]].fillna('')
+    records['Weight'] = records['Weight'].fillna(0.0).astype(float)
+    records['Raw Weight'] = (records['Weight'] * 10).round().astype(int).map('{:03d}'.format)
+    for column in OOG_FIELDS:
+        records[column] = records[column].fillna(0).astype(np.int64)
+    records['OOG Dimensions'] = np.where((records[list(OOG_FIELDS)] > 0).any(axis=1), 'DIM', '')
+
+    for column, (start, end) in SLOT_FIELDS.items():
+        records[column] = pd.to_numeric(records['Slot'].str[start:end], errors='coerce').fillna(0).astype(np.int64)
+    records = records[columns + ['Weight'] + list(SLOT_FIELDS) + list(OOG_FIELDS)]
+
+    imdg = decode_imdg(np.empty((0, RECORD_LENGTH), np.uint8), np.arange(0))
+    if dangerous_goods:
+        imdg = pd.DataFrame(dangerous_goods).reindex(columns=imdg.columns, fill_value='')
+        imdg['Net Weight'] = 0.0
+
+    header.record_count = len(records)
+    return AscPlan(header_lines, records, {'IMDG': imdg}, header)
+
+
+def read_baplie(file_path: str) -> AscPlan:
+    """Read a BAPLIE EDIFACT file (plain, gzip compressed or zip member) into the ASC plan model"""
+    with open_plan_file(file_path) as f:
+        return parse_baplie(f)
@@ -0,0 +1,208 @@
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+from container_types import lookup_types
+from gui_application import ensure_gui_application
+from stowage import DECK_TIER_START, EMPTY_SLOT, SlotGrid
+
+# What the cells of the bay plan are colored by
+COLOR_MODES = ['POD', 'Full/Empty', 'Reefer', 'IMO', 'OOG', 'Operation']
+
+# Colors of fixed labels, other labels (ports) take the palette in order
+LABEL_COLORS: Dict[str, str] = {
+    'F': '#1f4e79', 'E': '#bdd7ee',
+    'Reefer': '#00b0f0', 'IMO': '#e02020', 'OOG': '#ff9900', 'Other': '#d9d9d9',
+    'DIS': '#4a6fa5', 'LOD': '#70ad47', 'TSD': '#90ee90', 'TSL': '#c5e0b4', 'TPF': '#ffc0cb',
+}
+PALETTE = ['#4a6fa5', '#f0a04b', '#70ad47', '#c00000', '#7030a0', '#00b0f0', '#bf9000', '#ff66cc',
+           '#548235', '#2f5597', '#a5a5a5', '#843c0c']
+
+CELL_SIZE = 14
+TILE_PADDING = 6
+TILE_HEADER = 18
+# Gap between the deck and hold part of a bay (hatch cover)
+HATCH_GAP = 6
+TILES_PER_LINE = 8
+LEGEND_HEIGHT = 24
+
+
+def cell_labels(records: pd.DataFrame, mode: str) -> np.ndarray:
+    """
+    Label of every record for the color mode
+
+    Args:
+        records: Classified container records (ContainerAnalyzer.records)
+        mode: One of COLOR_MODES
+
+    Returns:
+        Array of labels aligned with records
+    """
+    if mode == 'POD':
+        return records['POD'].to_numpy(dtype=str)
+    if mode == 'Full/Empty':
+        return records['Full/Empty'].to_numpy(dtype=str)
+    if mode == 'Reefer':
+        return np.where(lookup_types(records['Container Type'])['Reefer'], 'Reefer', 'Other')
+    if mode == 'IMO':
+        return np.where(records['IMO'] == 'Yes', 'IMO', 'Other')
+    if mode == 'OOG':
+        return np.where(records['OOG'] == 'Yes', 'OOG', 'Other')
+    if mode == 'Operation':
+        # TPF boxes stand out from the DIS/LOD/TSD/TSL classification
+        return np.where(records['To TPF'] == 'Yes', 'TPF', records['Operation'].to_numpy(dtype=str))
+    raise ValueError(f"Unknown color mode: {mode}")
+
+
+def label_colors(labels: np.ndarray) -> Dict[str, str]:
+    """Color of every distinct label, palette colors in order of first appearance"""
+    colors = {}
+    for label in pd.unique(labels):
+        colors[label] = LABEL_COLORS.get(label, PALETTE[len(colors) % len(PALETTE)])
+    return colors
+
+
+class BayPlanRenderer:
+    """
+    Draws the row x tier cross-section of every bay and keeps the bay tiles
+
+    A tile is redrawn only when the content of its bay (containers, labels and
+    colors) changes, so rendering a revised plan only repaints the changed bays.
+    Tiles are kept per plan, so several plans can be rendered from worker
+    threads at once without evicting each other's tiles.
+    """
+
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        # (Plan, bay, color mode) -> (content key, QImage)
+        self._tiles = {}
+        self._lock = threading.Lock()
+        self.drawn_tiles = 0
+        self.reused_tiles = 0
+
+    @staticmethod
+    def _row_order(rows: np.ndarray) -> List[int]:
+        """Rows as seen from aft: even rows (port) outside in, row 00, then odd rows (starboard)"""
+        even = sorted((row for row in rows if row % 2 == 0 and row), reverse=True)
+        odd = sorted(row for row in rows if row % 2 == 1)
+        return even + [row for row in rows if row == 0] + odd
+
+    def _draw_tile(self, bay: int, cells: np.ndarray, labels: np.ndarray, colors: Dict[str, str],
+                   rows: List[int], deck_tiers: List[int], hold_tiers: List[int]):
+        from PyQt5.QtCore import QRectF, Qt
+        from PyQt5.QtGui import QColor, QImage, QPainter
+
+        size = self.cell_size
+        width = len(rows) * size + 2 * TILE_PADDING
+        height = TILE_HEADER + (len(deck_tiers) + len(hold_tiers)) * size + HATCH_GAP + TILE_PADDING
+        image = QImage(width, height, QImage.Format_ARGB32)
+        image.fill(QColor('white'))
+        painter = QPainter(image)
+        try:
+            painter.drawText(QRectF(0, 0, width, TILE_HEADER), Qt.AlignCenter, f'Bay {bay:02d}')
+            # Deck tiers top down, then hold tiers below the hatch cover
+            tier_y = {tier: TILE_HEADER + i * size for i, tier in enumerate(sorted(deck_tiers, reverse=True))}
+            hold_top = TILE_HEADER + len(deck_tiers) * size + HATCH_GAP
+            tier_y.update({tier: hold_top + i * size for i, tier in enumerate(sorted(hold_tiers, reverse=True))})
+            painter.drawLine(TILE_PADDING, hold_top - HATCH_GAP // 2, width - TILE_PADDING, hold_top - HATCH_GAP // 2)
+
+            for x_index, row in enumerate(rows):
+                for tier, y in tier_y.items():
+                    if row >= cells.shape[0] or tier >= cells.shape[1] or cells[row, tier] == EMPTY_SLOT:
+                        continue
+                    rect = QRectF(TILE_PADDING + x_index * size + 1, y + 1, size - 2, size - 2)
+                    painter.fillRect(rect, QColor(colors[labels[cells[row, tier]]]))
+        finally:
+            painter.end()
+        return image
+
+    def render_bays(self, records: pd.DataFrame, grid: SlotGrid, mode: str = 'POD',
+                    plan: str = '') -> Tuple[list, Dict[str, str]]:
+        """
+        Tiles of every used bay for the color mode
+
+        Args:
+            records: Classified container records (ContainerAnalyzer.records)
+            grid: Slot grid of the records
+            mode: One of COLOR_MODES
+            plan: Name the tiles are kept under, the same for every revision of a plan (asc_plan.plan_stem)
+
+        Returns:
+            Tuple of the (bay, QImage) tiles and the label colors for the legend
+        """
+        ensure_gui_application()
+        labels = cell_labels(records, mode)
+        colors = label_colors(labels[grid.placed])
+
+        # The same rows and tiers in every tile keep the bays aligned
+        occupied = grid.occupied
+        rows = self._row_order(np.flatnonzero(occupied.any(axis=(0, 2))))
+        tiers = np.flatnonzero(occupied.any(axis=(0, 1)))
+        deck_tiers = [int(tier) for tier in tiers if tier >= DECK_TIER_START]
+        hold_tiers = [int(tier) for tier in tiers if tier < DECK_TIER_START]
+
+        container_numbers = records['Container Number'].to_numpy()
+        tiles = []
+        for bay in grid.bays:
+            cells = grid.cells[bay]
+            cell_records = cells[cells != EMPTY_SLOT]
+            bay_labels = labels[cell_records]
+            # Keyed on content, not record positions, so lines moving in a revised file do not count
+            key = (tuple(rows), tuple(tiers), cells.shape, (cells != EMPTY_SLOT).tobytes(),
+                   tuple(container_numbers[cell_records]),
+                   tuple(bay_labels), tuple(colors[label] for label in bay_labels))
+            with self._lock:
+                cached = self._tiles.get((plan, bay, mode))
+                is_cached = cached is not None and cached[0] == key
+                if is_cached:
+                    self.reused_tiles += 1
+                else:
+                    self.drawn_tiles += 1
+            if is_cached:
+                image = cached[1]
+            else:
+                image = self._draw_tile(int(bay), cells, labels, colors, rows, deck_tiers, hold_tiers)
+                with self._lock:
+                    self._tiles[plan, bay, mode] = (key, image)
+            tiles.append((int(bay), image))
+        return tiles, colors
+
+    def render(self, records: pd.DataFrame, grid: SlotGrid, mode: str = 'POD', plan: str = ''):
+        """Compose the bay tiles into one image with a legend"""
+        from PyQt5.QtCore import QRectF
+        from PyQt5.QtGui import QColor, QImage, QPainter
+
+        tiles, colors = self.render_bays(records, grid, mode, plan)
+        tile_width = max((image.width() for _, image in tiles), default=1)
+        tile_height = max((image.height() for _, image in tiles), default=1)
+        columns = min(TILES_PER_LINE, max(len(tiles), 1))
+        lines = -(-len(tiles) // columns) if tiles else 1
+
+        image = QImage(columns * tile_width, lines * tile_height + LEGEND_HEIGHT, QImage.Format_ARGB32)
+        image.fill(QColor('white'))
+        painter = QPainter(image)
+        try:
+            for i, (_, tile) in enumerate(tiles):
+                painter.drawImage((i % columns) * tile_width, (i // columns) * tile_height, tile)
+
+            # Legend below the tiles
+            metrics = painter.fontMetrics()
+            x = TILE_PADDING
+            y = lines * tile_height + (LEGEND_HEIGHT - CELL_SIZE) // 2
+            painter.drawText(x, y + CELL_SIZE - 2, f'{mode}:')
+            x += metrics.horizontalAdvance(f'{mode}:') + 8
+            for label, color in colors.items():
+                text = label or '(blank)'
+                painter.fillRect(QRectF(x, y, CELL_SIZE, CELL_SIZE), QColor(color))
+                painter.drawText(x + CELL_SIZE + 4, y + CELL_SIZE - 2, text)
+                x += CELL_SIZE + 4 + metrics.horizontalAdvance(text) + 12
+        finally:
+            painter.end()
+        return image
+
+    def save(self, records: pd.DataFrame, grid: SlotGrid, file_path: str, mode: str = 'POD', plan: str = '') -> str:
+        """Render the bay plan and save it as PNG"""
+        if not self.render(records, grid, mode, plan).save(file_path, 'PNG'):
+            raise IOError(f"Could not save bay plan: {file_path}")
+        return file_path
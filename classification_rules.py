@@ -0,0 +1,197 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from iso6346 import normalize_container_numbers
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'classification_rules.txt')
+
+# UN/LOCODE of the terminal the summary is made for
+DEFAULT_TERMINAL_PORT = 'KRPUS'
+
+# UN/LOCODE: two letter country code and three letter/digit location ('KRPUS'); 'XX' is the
+# placeholder country of unknown destinations ('XXOPT' = optional discharge)
+_LOCODE_PATTERN = r'^[A-Z]{2}[A-Z2-9]{3}$'
+PLACEHOLDER_COUNTRY = 'XX'
+
+# Columns the summary reads, every rules file must assign them
+REQUIRED_COLUMNS = ['Exclude', 'Operation', 'To TPF', 'To Truck']
+
+_RULE_PATTERN = re.compile(r'^(?P<column>[^=]+?)\s*=\s*(?P<value>.*?)(?:\s+when\s+(?P<conditions>.+))?$')
+_COMPARISON_PATTERN = re.compile(r'^(?P<field>.+?)\s*(?P<operator>==|!=)\s*(?P<values>.*)$')
+_MEMBERSHIP_PATTERN = re.compile(r'^(?P<negate>not\s+)?in\s+(?P<list>.+)$')
+
+
+def _parse_value(text: str) -> str:
+    """Strip quotes from a rule value, '' is the blank value"""
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '\'"':
+        return text[1:-1]
+    return text
+
+
+def derive_port_calls(records: pd.DataFrame, terminal_port: str = DEFAULT_TERMINAL_PORT) -> pd.DataFrame:
+    """
+    Derive the move at the terminal from the ports of every record
+
+    Args:
+        records: Container records with POL, POD, Port Of Origin and Destination
+        terminal_port: UN/LOCODE of the terminal ('KRPUS'); POL and POD hold
+            the last three letters ('PUS')
+
+    Returns:
+        DataFrame aligned with records with 'Direction' ('DIS' when discharged
+        at the terminal, 'LOD' when loaded, '' when remaining on board) and
+        'Route' ('Local' when the box starts or ends at the terminal, 'TS' when
+        it is transhipped, '' when remaining on board). A blank final port
+        counts as Local; so does one that is not a UN/LOCODE (placeholders such
+        as 'XXOPT'), which is also marked 'Yes' in 'Unknown Final Port' for review.
+    """
+    port_code = terminal_port[-3:]
+    is_discharge = (records['POD'] == port_code).to_numpy()
+    is_load = (records['POL'] == port_code).to_numpy() & ~is_discharge
+
+    # Discharged boxes are local when their final destination is the terminal,
+    # loaded boxes when they were received at the terminal; blank means local
+    final_port = pd.Series(np.where(is_discharge, records['Destination'], records['Port Of Origin']),
+                           index=records.index)
+    is_unknown = ((~final_port.str.match(_LOCODE_PATTERN) | final_port.str.startswith(PLACEHOLDER_COUNTRY))
+                  & (final_port != '') & (is_discharge | is_load)).to_numpy()
+    is_local = is_unknown | final_port.isin(['', terminal_port]).to_numpy()
+
+    return pd.DataFrame({
+        'Direction': np.select([is_discharge, is_load], ['DIS', 'LOD'], default=''),
+        'Route': np.select([~(is_discharge | is_load), is_local], ['', 'Local'], default='TS'),
+        'Unknown Final Port': np.where(is_unknown, 'Yes', 'No')
+    }, index=records.index)
+
+
+class Condition:
+    """A single comparison or list membership test, evaluated as a boolean mask"""
+
+    def __init__(self, text: str):
+        self.text = text
+        membership = _MEMBERSHIP_PATTERN.match(text)
+        comparison = _COMPARISON_PATTERN.match(text)
+        if membership:
+            self.list_name = membership.group('list').strip()
+            self.negate = bool(membership.group('negate'))
+            self.field = None
+        elif comparison:
+            self.list_name = None
+            self.field = comparison.group('field').strip()
+            self.negate = comparison.group('operator') == '!='
+            self.values = [_parse_value(value) for value in comparison.group('values').split(',')]
+        else:
+            raise ValueError(f"Invalid condition: {text}")
+
+    def evaluate(self, records: pd.DataFrame, list_masks: Dict[str, np.ndarray],
+                 context: Dict[str, str]) -> np.ndarray:
+        if self.list_name is not None:
+            mask = list_masks.get(self.list_name)
+            if mask is None:
+                mask = np.zeros(len(records), dtype=bool)
+        elif self.field in context:
+            mask = np.full(len(records), context[self.field] in self.values)
+        elif self.field in records.columns:
+            mask = records[self.field].isin(self.values).to_numpy()
+        else:
+            raise ValueError(f"Unknown field in rule condition: {self.field}")
+        return ~mask if self.negate else mask
+
+
+class Rule:
+    """'<Column> = <Value> when <Condition> and ...', all conditions must hold"""
+
+    def __init__(self, column: str, value: str, conditions: List[Condition], line_number: int = 0):
+        self.column = column
+        self.value = value
+        self.conditions = conditions
+        self.line_number = line_number
+
+    def evaluate(self, records: pd.DataFrame, list_masks: Dict[str, np.ndarray],
+                 context: Dict[str, str]) -> np.ndarray:
+        mask = np.ones(len(records), dtype=bool)
+        for condition in self.conditions:
+            mask &= condition.evaluate(records, list_masks, context)
+        return mask
+
+
+class ClassificationRules:
+    """Ordered classification rules compiled to boolean masks over the columnar plan"""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+
+    @classmethod
+    def from_text(cls, text: str) -> 'ClassificationRules':
+        """
+        Parse rules, one per line; blank lines and '#' comments are ignored
+
+        Raises:
+            ValueError: A line is not a valid rule, or no rule assigns one of the REQUIRED_COLUMNS
+        """
+        rules = []
+        for line_number, line in enumerate(text.splitlines(), 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            match = _RULE_PATTERN.match(line)
+            if not match:
+                raise ValueError(f"Invalid rule on line {line_number}: {line}")
+            conditions_text = match.group('conditions')
+            try:
+                conditions = [Condition(condition.strip())
+                              for condition in re.split(r'\s+and\s+', conditions_text)] if conditions_text else []
+            except ValueError as e:
+                raise ValueError(f"Invalid rule on line {line_number}: {str(e)}")
+            rules.append(Rule(match.group('column').strip(), _parse_value(match.group('value')),
+                              conditions, line_number))
+
+        assigned = {rule.column for rule in rules}
+        missing = [column for column in REQUIRED_COLUMNS if column not in assigned]
+        if missing:
+            raise ValueError(f"Rules assign no {', '.join(missing)} column "
+                             f"(required: {', '.join(REQUIRED_COLUMNS)})")
+        return cls(rules)
+
+    @classmethod
+    def from_file(cls, file_path: Optional[str] = None) -> 'ClassificationRules':
+        """Load rules from a file, defaults to classification_rules.txt next to this module"""
+        with open(file_path or DEFAULT_RULES_FILE, 'r', encoding='utf-8') as f:
+            return cls.from_text(f.read())
+
+    @property
+    def columns(self) -> List[str]:
+        """Columns assigned by the rules, in order of first appearance"""
+        return list(dict.fromkeys(rule.column for rule in self.rules))
+
+    def evaluate(self, records: pd.DataFrame, membership: pd.DataFrame,
+                 context: Dict[str, str]) -> pd.DataFrame:
+        """
+        Evaluate every rule over all records in one pass
+
+        Args:
+            records: Container records from asc_plan.read_records
+            membership: Membership index from container_lists.build_membership_index
+            context: Scalar fields such as {'Direction': 'DIS'}
+
+        Returns:
+            DataFrame with one column per rule column, aligned with records;
+            records that match no rule of a column get ''
+        """
+        plan_numbers = pd.Series(normalize_container_numbers(records['Container Number']))
+        list_masks = {
+            list_name: plan_numbers.isin(containers['Container']).to_numpy()
+            for list_name, containers in membership.groupby('List')
+        }
+
+        result = pd.DataFrame(index=records.index)
+        for column in self.columns:
+            column_rules = [rule for rule in self.rules if rule.column == column]
+            masks = [rule.evaluate(records, list_masks, context) for rule in column_rules]
+            values = [rule.value for rule in column_rules]
+            result[column] = np.select(masks, values, default='')
+        return result
@@ -1,275 +1,638 @@
 import sys
 import os
+import argparse
+import numpy as np
 import pandas as pd
-from collections import defaultdict
-from typing import List, Dict, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterable, Optional, Tuple
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QLabel, QTextEdit, QPushButton, 
                            QFileDialog, QMessageBox, QTabWidget,
-                           QFrame, QRadioButton, QButtonGroup)
-from PyQt5.QtCore import Qt, QMimeData
-from PyQt5.QtGui import QDragEnterEvent, QDropEvent
+                           QFrame, QRadioButton, QButtonGroup, QCheckBox,
+                           QComboBox, QDialog, QScrollArea)
+from PyQt5.QtCore import Qt, QMimeData, pyqtSignal
+from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QColor, QTextCursor, QTextFormat, QPixmap
 from openpyxl.styles import PatternFill
 from openpyxl import Workbook
+from asc_plan import (OOG_FIELDS, AscPlan, is_archive, list_archive_plans, plan_stem, preflight_check, read_plan,
+                      rotation_rank, write_filtered_plan)
+from baplie import is_edifact, read_baplie
+from classification_rules import DEFAULT_TERMINAL_PORT, ClassificationRules, derive_port_calls
+from container_types import lookup_types
+from crane_split import DEFAULT_CRANES, DEFAULT_MOVES_PER_HOUR, crane_split
+from bay_plan_render import COLOR_MODES, BayPlanRenderer
+from gui_application import ensure_gui_application
+from weight_distribution import cargo_lcg, read_bay_positions, start_weight_chart, weight_distribution
+from stowage import DEFAULT_STACK_WEIGHT_LIMITS, SlotGrid, discharge_ranks, find_restows, restows_by_bay, stack_report
+from container_lists import (LIST_FILE_EXTENSIONS, build_membership_index, read_container_files,
+                             reconcile_lists)
+from dangerous_goods import build_dg_manifest, container_classes, summarize_by_class
+from iso6346 import normalize_container_numbers, validate_container_numbers
+from summary_compare import compare_summaries, read_summary_workbook
+from tariff import apply_tariff, charges_with_total, read_tariff
 
-#pyinstaller -w -F --add-binary="C:/Users/kod03/AppData/Local/Programs/Python/Python311/tcl/tkdnd2.8;tkdnd2.8" container_gui2.py
+# Operator billed by the 'Summary' sheet; other operators get a sheet of their own
+BILLING_OPERATOR = 'MSC'
+
+# Bay tiles are kept per plan between runs, a revised plan only redraws the changed bays
+BAY_PLAN_RENDERER = BayPlanRenderer()
+
+# Order of the --stack-limits values
+STACK_LIMIT_KEYS = [(20, 'Deck'), (40, 'Deck'), (20, 'Hold'), (40, 'Hold')]
+
+# Summary columns added up when plans are merged, the 'Max ...' columns take the maximum
+SUMMARY_TOTAL_COLUMNS = ['Weight', 'Quantity', 'TEU', 'Reefer Plugs']
+# Operations of a vessel call in report order
+CALL_OPERATIONS = ['DIS', 'LOD', 'TSD', 'TSL']
+
+# Columns of the OOG detail sheet, over dimensions in centimeters
+OOG_DETAIL_COLUMNS = [
+    'Line', 'Slot', 'Container Number', 'Operator Code', 'Operation', 'POL', 'POD', 'Container Type',
+    'Full/Empty', 'Weight'
+] + list(OOG_FIELDS)
+
+#pyinstaller -w -F --add-binary="C:/Users/kod03/AppData/Local/Programs/Python/Python311/tcl/tkdnd2.8;tkdnd2.8" --add-data="classification_rules.txt;." container_gui2.py
+
+def check_plan_file(file_path: str) -> List[str]:
+    """Pre-flight integrity check of ASC files; BAPLIE EDIFACT files have no fixed layout to check"""
+    if is_archive(file_path):
+        # Every plan member of a zipped call package, prefixed with the member name
+        return [f"{member[len(file_path) + 1:]}: {problem}"
+                for member in list_archive_plans(file_path) for problem in check_plan_file(member)]
+    return [] if is_edifact(file_path) else preflight_check(file_path)
+
+def load_plan(file_path: str) -> AscPlan:
+    """Read a CASP ASC or BAPLIE EDIFACT file into the same plan model"""
+    if is_edifact(file_path):
+        return read_baplie(file_path)
+    # Reject truncated or padded files before decoding every record
+    problems = preflight_check(file_path)
+    if problems:
+        raise ValueError("ASC file failed integrity check: " + "; ".join(problems))
+    return read_plan(file_path)
 
 class ContainerAnalyzer:
-    def __init__(self, operation_type: str, tpf_containers: Set[str], 
-                 local_containers: Set[str], same_ts_containers: Set[str], 
-                 external_ts_containers: Set[str], delete_containers: Set[str]):
+    def __init__(self, operation_type: str, tpf_containers: Iterable[str], 
+                 local_containers: Iterable[str], same_ts_containers: Iterable[str], 
+                 external_ts_containers: Iterable[str], delete_containers: Iterable[str],
+                 rules: ClassificationRules = None, terminal_port: str = DEFAULT_TERMINAL_PORT):
         """
         Initialize ContainerAnalyzer
         
         Args:
-            operation_type: 'DIS' or 'LOD'
-            tpf_containers: Set of container numbers for TPF
-            local_containers: Set of container numbers for Local
-            same_ts_containers: Set of container numbers for Same TS
-            external_ts_containers: Set of container numbers for External TS
-            delete_containers: Set of container numbers to exclude from summary
+            operation_type: 'DIS', 'LOD' or 'AUTO' (derived per container from its ports)
+            tpf_containers: Container numbers for TPF
+            local_containers: Container numbers for Local
+            same_ts_containers: Container numbers for Same TS
+            external_ts_containers: Container numbers for External TS
+            delete_containers: Container numbers to exclude from summary
+            rules: Classification rules (optional, defaults to classification_rules.txt)
+            terminal_port: UN/LOCODE of the terminal, used by the AUTO operation type
         """
-        if operation_type not in ['DIS', 'LOD']:
-            raise ValueError("operation_type must be either 'DIS' or 'LOD'")
+        if operation_type not in ['DIS', 'LOD', 'AUTO']:
+            raise ValueError("operation_type must be either 'DIS', 'LOD' or 'AUTO'")
             
         self.operation_type = operation_type
-        self.tpf_containers = tpf_containers
-        self.local_containers = local_containers
-        self.same_ts_containers = same_ts_containers
-        self.external_ts_containers = external_ts_containers
-        self.delete_containers = delete_containers
-        self.container_groups = defaultdict(list)
-
-    def _extract_container_info(self, line: str) -> Tuple[str, str, str, str]:
-        """Extract container information from ASC file line"""
-        container_number = line[7:18].strip()  # Adjust position to extract container number correctly
-        return (
-            container_number,
-            line[44:48].strip(),  # container_type (45-48 position)
-            line[51:52].strip(),  # full_empty (52 position)
-            line[19:22].strip(),  # operator_code (MSC)
-        )
+        self.terminal_port = terminal_port
+        # Normalized membership index of all list tabs
+        self.membership = build_membership_index({
+            'TPF': tpf_containers,
+            'Local': local_containers,
+            'Same TS': same_ts_containers,
+            'External TS': external_ts_containers,
+            'Delete': delete_containers
+        })
+        self.rules = rules if rules is not None else ClassificationRules.from_file()
+        self.plan = None
+        self.records = None
+        self.grid = None
+        self.dg_manifest = None
 
-    def parse_container_data(self, line: str) -> Dict:
-        """Parse a single line from ASC file"""
-        container_number, container_type, full_empty, operator_code = self._extract_container_info(line)
+    def classify_records(self, records: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add classification and flag columns to the container records
 
-        # Extract weight from line[48:51] and convert to float
-        raw_weight = line[48:51].strip()
-        try:
-            weight = float(raw_weight) / 10
-        except ValueError:
-            weight = 0.0
-
-        # Check for IMO container (line[60:64])
-        is_imo = 'Yes' if line[60:64].strip() else 'NO'
-
-        # Check for OOG container in specified ranges
-        oog_ranges = [
-            line[92:95].strip(),  # [92,3]
-            line[95:98].strip(),  # [95,3]
-            line[98:101].strip(), # [98,3]
-            line[101:104].strip(), # [101,3]
-            line[104:107].strip()  # [104,3]
-        ]
-        is_oog = 'Yes' if any(oog_ranges) else 'No'
-
-        # Debug print for container matching
-        asc_container = container_number.replace(' ', '')
-        tpf_matches = [c for c in self.tpf_containers if c.replace(' ', '') == asc_container]
-        truck_matches = [c for c in self.external_ts_containers if c.replace(' ', '') == asc_container]
-        local_matches = [c for c in self.local_containers if c.replace(' ', '') == asc_container]
-        same_ts_matches = [c for c in self.same_ts_containers if c.replace(' ', '') == asc_container]
-        delete_matches = [c for c in self.delete_containers if c.replace(' ', '') == asc_container]
-        
-        is_tpf = len(tpf_matches) > 0
-        is_truck = len(truck_matches) > 0
-        is_local = len(local_matches) > 0
-        is_same_ts = len(same_ts_matches) > 0
-        is_delete = len(delete_matches) > 0
-        
-        # Skip containers that should be deleted
-        if is_delete:
-            return None
-        
-        # Determine operation type based on matches
-        operation_type = self.operation_type  # Default DIS or LOD
-        if is_local:
-            operation_type = 'DIS' if self.operation_type == 'DIS' else 'LOD'
-        elif is_same_ts or is_truck:
-            operation_type = 'TSD' if self.operation_type == 'DIS' else 'TSL'
-        
-        if is_tpf:
-            print(f"TPF Match - ASC: '{container_number}' matches with TPF: '{tpf_matches[0]}'")
-        if is_truck:
-            print(f"Truck Match - ASC: '{container_number}' matches with External TS: '{truck_matches[0]}'")
-        if is_local:
-            print(f"Local Match - ASC: '{container_number}' matches with Local: '{local_matches[0]}'")
-        if is_same_ts:
-            print(f"Same TS Match - ASC: '{container_number}' matches with Same TS: '{same_ts_matches[0]}'")
-       
-        # Create container key based on all fields that affect grouping
-        group_key = (
-            operation_type,  # Operation type based on matches
-            container_type,
-            full_empty,
-            operator_code,
-            is_oog,  # OOG
-            'No',  # Damaged
-            'No',  # SOC
-            'No',  # Coastal Cargo
-            'No',  # To Rail
-            'No',  # To Barge
-            'Yes' if is_tpf else 'No',  # To TPF
-            'Yes' if is_truck else 'No',  # To Truck
-            'No',   # Not for MSC Account
-            is_imo  # IMO
-        )
+        Args:
+            records: Container records from read_records
 
-        return {
-            'container_number': container_number,
-            'group_key': group_key,
-            'weight': weight
-        }
+        Returns:
+            Records with Operation, To TPF, To Truck, Exclude, OOG and IMO columns
+        """
+        if self.operation_type == 'AUTO':
+            # Direction and Route come from each record's POL/POD against the terminal port
+            fields = records.join(derive_port_calls(records, self.terminal_port))
+            context = {}
+            unknown = fields['Unknown Final Port'] == 'Yes'
+            if unknown.any():
+                final_ports = pd.Series(np.where(fields['Direction'] == 'DIS', fields['Destination'],
+                                                 fields['Port Of Origin']))[unknown.to_numpy()]
+                ports = ', '.join(f"{port} {count}" for port, count in final_ports.value_counts().items())
+                print(f"Warning: {unknown.sum():,} containers with a placeholder final port classed as Local ({ports})")
+        else:
+            fields = records
+            context = {'Direction': self.operation_type, 'Route': '', 'Unknown Final Port': ''}
+        classified = records.join(self.rules.evaluate(fields, self.membership, context))
+
+        # IMO container if the internal IMDG index (line[60:64]) is set
+        classified['IMO'] = np.where(classified['IMDG Index'] != '', 'Yes', 'NO')
+        # OOG container if any over dimension (line[92:107]) is set
+        classified['OOG'] = np.where(classified['OOG Dimensions'] != '', 'Yes', 'No')
+        return classified
 
     def process_file(self, file_path: str) -> pd.DataFrame:
         """
         Process ASC file and return summary DataFrame
         
         Args:
-            file_path: Path to ASC file
+            file_path: Path to ASC or BAPLIE EDIFACT file
             
         Returns:
-            DataFrame with container summary
+            DataFrame with container summary of all operators
         """
         try:
             print("\nProcessing containers...")
-            print(f"TPF containers to match: {list(self.tpf_containers)}")
-            print(f"External TS containers to match: {list(self.external_ts_containers)}")
-            
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if not line.startswith('$'):  # Skip header lines
-                        container_data = self.parse_container_data(line)
-                        # Skip None values (deleted containers) and only include containers with MSC operator code
-                        if container_data is not None and container_data['group_key'][3] == 'MSC':
-                            self.container_groups[container_data['group_key']].append(
-                                (container_data['container_number'], container_data['weight'])
-                            )
+            self.plan = load_plan(file_path)
+            for issue in self.plan.integrity_issues():
+                print(f"Warning: {issue}")
+            self.records = self.classify_records(self.plan.records)
+            # Join DG containers with the IMDG section on the internal IMDG index
+            self.records['IMDG Class'] = container_classes(self.records, self.plan.imdg)
+            # Deleted and remain-on-board boxes are not worked, so they stay off the manifest
+            self.dg_manifest = build_dg_manifest(self.records[self.records['Exclude'] != 'Yes'], self.plan.imdg)
+            # Bay x row x tier index of the records for stowage queries
+            self.grid = SlotGrid(self.records)
         except FileNotFoundError:
             raise FileNotFoundError(f"ASC file not found: {file_path}")
         except Exception as e:
             raise Exception(f"Error processing ASC file: {str(e)}")
 
-        # Create summary records
-        summary_records = []
-        for group_key, containers in self.container_groups.items():
-            # Calculate total weight for the group and round to nearest integer
-            total_weight = round(sum(weight for _, weight in containers))
-            
-            record = {
-                'Operation': group_key[0],
-                'Container Type': group_key[1],
-                'Full/Empty': group_key[2],
-                'Operator Code': group_key[3],
-                'Weight': total_weight,
-                'Quantity': len(containers),
-                'OOG': group_key[4],
-                'Damaged': group_key[5],
-                'IMO': group_key[13],
-                'SOC': group_key[6],
-                'Coastal Cargo': group_key[7],
-                'To Rail': group_key[8],
-                'To Barge': group_key[9],
-                'To TPF': group_key[10],
-                'To Truck': group_key[11],
-                'Not for MSC Account': group_key[12]
-            }
-            summary_records.append(record)
+        for column in ['To TPF', 'To Truck']:
+            print(f"{column} containers matched: {(self.records[column] == 'Yes').sum():,}")
 
-        # Create DataFrame
-        df = pd.DataFrame(summary_records)
-        column_order = [
-            'Operation', 'Container Type', 'Full/Empty', 'Operator Code', 'Weight',
-            'Quantity', 'OOG', 'Damaged', 'IMO', 'SOC', 'Coastal Cargo', 'To Rail',
-            'To Barge', 'To TPF', 'To Truck', 'Not for MSC Account'
+        # Skip deleted containers, every operator is aggregated in the same pass
+        included = self.records[self.records['Exclude'] != 'Yes']
+
+        # Fields that are not in the ASC file yet
+        included = included.assign(**{column: 'No' for column in [
+            'Damaged', 'SOC', 'Coastal Cargo', 'To Rail', 'To Barge', 'Not for MSC Account'
+        ]})
+
+        group_columns = [
+            'Operation', 'POL', 'POD', 'Container Type', 'Full/Empty', 'Operator Code', 'OOG', 'Damaged',
+            'SOC', 'Coastal Cargo', 'To Rail', 'To Barge', 'To TPF', 'To Truck',
+            'Not for MSC Account', 'IMO'
         ]
+        # Group in order of first appearance, total weight rounded to nearest integer
+        # and the largest over dimension of every direction
+        df = included.groupby(group_columns, sort=False).agg(
+            Weight=('Weight', 'sum'),
+            Quantity=('Weight', 'size'),
+            **{f'Max {name}': (name, 'max') for name in OOG_FIELDS}
+        ).reset_index()
+        df['Weight'] = df['Weight'].round().astype(int)
+
+        # TEU, reefer plugs and special equipment per row from the container type table
+        types = lookup_types(df['Container Type'])
+        df['TEU'] = (df['Quantity'] * types['TEU']).astype(int)
+        df['Reefer Plugs'] = df['Quantity'].where(types['Reefer'] & (df['Full/Empty'] == 'F'), 0)
+        df['Open Top'] = np.where(types['Open Top'], 'Yes', 'No')
+        df['Flat Rack'] = np.where(types['Flat Rack'], 'Yes', 'No')
+
+        # One block per load/discharge port pair, ports in the order of the vessel's port rotation
+        rotation = self.plan.header.port_rotation
+        operation_rank = rotation_rank(df['Operation'], [])
+        df = df.iloc[np.lexsort((rotation_rank(df['POD'], rotation), rotation_rank(df['POL'], rotation),
+                                 operation_rank))].reset_index(drop=True)
+
+        column_order = [
+            'Operation', 'POL', 'POD', 'Container Type', 'Full/Empty', 'Operator Code', 'Weight',
+            'Quantity', 'TEU', 'Reefer Plugs', 'OOG', 'Open Top', 'Flat Rack', 'Damaged', 'IMO', 'SOC',
+            'Coastal Cargo', 'To Rail', 'To Barge', 'To TPF', 'To Truck', 'Not for MSC Account'
+        ] + [f'Max {name}' for name in OOG_FIELDS]
         return df[column_order]
 
+def build_validation_report(records: pd.DataFrame, container_lists: Dict[str, List[str]]) -> pd.DataFrame:
+    """
+    Validate ISO 6346 owner codes and check digits of the pasted lists and of every plan record
+
+    Args:
+        records: Container records of the ASC file
+        container_lists: Container lists keyed by tab name
+
+    Returns:
+        DataFrame with one row per invalid container number
+    """
+    reports = []
+    for source, containers in container_lists.items():
+        validation = validate_container_numbers(containers)
+        validation.insert(0, 'Line', np.arange(1, len(validation) + 1))
+        validation.insert(0, 'Source', source)
+        reports.append(validation)
+
+    validation = validate_container_numbers(records['Container Number'])
+    validation.insert(0, 'Line', records['Line'].to_numpy())
+    validation.insert(0, 'Source', 'ASC')
+    reports.append(validation)
+
+    report = pd.concat(reports, ignore_index=True)
+    return report[~report['Valid']].drop(columns='Valid')
+
+def build_plan_info(plan) -> pd.DataFrame:
+    """Header metadata, records read and integrity warnings of the plan as Field/Value rows"""
+    info = plan.header.as_dict()
+    info['Records Read'] = len(plan.records)
+    for number, issue in enumerate(plan.integrity_issues(), 1):
+        info[f'Warning {number}'] = issue
+    return pd.DataFrame({'Field': list(info.keys()), 'Value': list(info.values())})
+
+def write_summary_sheet(writer: pd.ExcelWriter, summary_df: pd.DataFrame, sheet_name: str) -> None:
+    """Write a summary DataFrame and highlight 'Yes' flags and transhipment operations"""
+    summary_df.to_excel(writer, index=False, sheet_name=sheet_name)
+    
+    # Get the worksheet
+    worksheet = writer.sheets[sheet_name]
+    
+    # Define fills
+    pink_fill = PatternFill(start_color='FFFFC0CB', end_color='FFFFC0CB', fill_type='solid')
+    green_fill = PatternFill(start_color='90EE90', end_color='90EE90', fill_type='solid')
+    
+    # Find the Operation column index
+    operation_col = None
+    for idx, col in enumerate(worksheet[1], 1):  # 1-based indexing for openpyxl
+        if col.value == 'Operation':
+            operation_col = idx
+            break
+    
+    # Apply fills
+    for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row):
+        # Apply pink fill to cells containing 'Yes'
+        for cell in row:
+            if cell.value == 'Yes':
+                cell.fill = pink_fill
+        
+        # Apply green fill to Operation cells containing 'TSD' or 'TSL'
+        if operation_col:
+            operation_cell = row[operation_col - 1]  # Convert to 0-based index
+            if operation_cell.value in ['TSD', 'TSL']:
+                operation_cell.fill = green_fill
+
 def create_summary(asc_file: str, operation_type: str, 
                   tpf_containers: List[str], local_containers: List[str],
                   same_ts_containers: List[str], external_ts_containers: List[str],
                   delete_containers: List[str],
-                  output_file: str = None) -> None:
+                  output_file: str = None, rules_file: str = None,
+                  terminal_port: str = DEFAULT_TERMINAL_PORT,
+                  stack_weight_limits: Dict[Tuple[int, str], float] = None,
+                  cranes: int = DEFAULT_CRANES,
+                  moves_per_hour: float = DEFAULT_MOVES_PER_HOUR,
+                  bay_positions_file: str = None, chart_file: str = None,
+                  bay_plan_file: str = None, bay_plan_mode: str = 'POD',
+                  filtered_file: str = None, compare_file: str = None,
+                  tariff_file: str = None) -> pd.DataFrame:
     """
     Create container summary Excel file
     
     Args:
-        asc_file: Path to ASC file
-        operation_type: 'DIS' or 'LOD'
+        asc_file: Path to ASC or BAPLIE EDIFACT file
+        operation_type: 'DIS', 'LOD' or 'AUTO'
         tpf_containers: List of container numbers for TPF
         local_containers: List of container numbers for Local
         same_ts_containers: List of container numbers for Same TS
         external_ts_containers: List of container numbers for External TS
         delete_containers: List of container numbers to exclude from summary
         output_file: Path to output Excel file (optional, defaults to ASC filename with .xlsx extension)
+        rules_file: Path to classification rules file (optional, defaults to classification_rules.txt)
+        terminal_port: UN/LOCODE of the terminal for the AUTO operation type (optional)
+        stack_weight_limits: Stack weight limits in tons by (20 or 40, 'Deck' or 'Hold') (optional)
+        cranes: Number of quay cranes for the crane split (optional)
+        moves_per_hour: Gross moves per hour of one crane (optional)
+        bay_positions_file: CSV with the LCG of every bay (optional, estimated when omitted)
+        chart_file: PNG file for the weight per bay chart (optional, rendered on a background thread)
+        bay_plan_file: PNG file for the bay plan cross-sections (optional)
+        bay_plan_mode: What the bay plan is colored by, one of COLOR_MODES
+        filtered_file: ASC file for the plan without the deleted containers (optional, ASC input only)
+        compare_file: Existing summary workbook to check against the computed summary (optional)
+        tariff_file: CSV or YAML tariff table to price the billing summary with (optional)
+
+    Returns:
+        Reconciliation report of list entries not in the plan, in several lists or of another operator
     """
     try:
-        # Convert container lists to sets for faster lookup
-        tpf_set = set(tpf_containers)
-        local_set = set(local_containers)
-        same_ts_set = set(same_ts_containers)
-        external_ts_set = set(external_ts_containers)
-        delete_set = set(delete_containers)
-
         # Create analyzer and process file
-        analyzer = ContainerAnalyzer(operation_type, tpf_set, local_set, same_ts_set, external_ts_set, delete_set)
+        rules = ClassificationRules.from_file(rules_file)
+        analyzer = ContainerAnalyzer(operation_type, tpf_containers, local_containers, same_ts_containers,
+                                     external_ts_containers, delete_containers, rules, terminal_port)
         summary_df = analyzer.process_file(asc_file)
 
+        container_lists = {
+            'TPF': tpf_containers,
+            'Local': local_containers,
+            'Same TS': same_ts_containers,
+            'External TS': external_ts_containers,
+            'Delete': delete_containers
+        }
+        records = analyzer.records
+        validation_df = build_validation_report(records, container_lists)
+        reconciliation_df = reconcile_lists(analyzer.membership, records, BILLING_OPERATOR)
+
         # Use dragged ASC filename for output if not specified
         if output_file is None:
-            # Get just the filename from the full path
-            asc_filename = os.path.basename(asc_file)
-            output_file = asc_filename.replace('.ASC', '.xlsx')
+            # Get just the filename from the full path (without .gz, zip members prefixed with the archive name)
+            output_file = os.path.basename(plan_stem(asc_file)) + '.xlsx'
 
         # Create Excel writer with openpyxl engine
         with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            # Write DataFrame to Excel
-            summary_df.to_excel(writer, index=False, sheet_name='Summary')
-            
-            # Get the worksheet
-            worksheet = writer.sheets['Summary']
-            
-            # Define fills
-            pink_fill = PatternFill(start_color='FFFFC0CB', end_color='FFFFC0CB', fill_type='solid')
-            green_fill = PatternFill(start_color='90EE90', end_color='90EE90', fill_type='solid')
-            
-            # Find the Operation column index
-            operation_col = None
-            for idx, col in enumerate(worksheet[1], 1):  # 1-based indexing for openpyxl
-                if col.value == 'Operation':
-                    operation_col = idx
-                    break
-            
-            # Apply fills
-            for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row):
-                # Apply pink fill to cells containing 'Yes'
-                for cell in row:
-                    if cell.value == 'Yes':
-                        cell.fill = pink_fill
-                
-                # Apply green fill to Operation cells containing 'TSD' or 'TSL'
-                if operation_col:
-                    operation_cell = row[operation_col - 1]  # Convert to 0-based index
-                    if operation_cell.value in ['TSD', 'TSL']:
-                        operation_cell.fill = green_fill
+            # Billing summary for MSC, then one sheet per partner operator
+            is_billing = summary_df['Operator Code'] == BILLING_OPERATOR
+            write_summary_sheet(writer, summary_df[is_billing], 'Summary')
+            for operator_code, operator_df in summary_df[~is_billing].groupby('Operator Code', sort=True):
+                write_summary_sheet(writer, operator_df, f"Summary {operator_code or '(blank)'}")
+                print(f"{operator_code or '(blank)'}: {operator_df['Quantity'].sum():,} containers")
+
+            # Quantity and weight mismatches per group against an existing summary workbook
+            if compare_file:
+                comparison_df = compare_summaries(read_summary_workbook(compare_file), summary_df)
+                comparison_df.to_excel(writer, index=False, sheet_name='Comparison')
+                print(f"{len(comparison_df)} groups differ from {os.path.basename(compare_file)} "
+                      f"(Comparison sheet)")
+
+            # Charges of the billing summary groups with the call total
+            if tariff_file:
+                write_charges_sheet(writer, summary_df[is_billing], tariff_file)
+
+            # Write vessel, voyage and record count from the ASC header
+            build_plan_info(analyzer.plan).to_excel(writer, index=False, sheet_name='Plan Info')
+
+            # Write the stack weight/height sanity check of every row stack
+            stacks_df = stack_report(analyzer.plan.records, analyzer.grid, stack_weight_limits)
+            stacks_df.to_excel(writer, index=False, sheet_name='Stacks')
+            overweight = int((stacks_df['Overweight'] == 'Yes').sum())
+            inverted = int((stacks_df['Inversions'] > 0).sum())
+            if overweight or inverted:
+                print(f"Stacks: {overweight} overweight, {inverted} with heavy-over-light inversions")
+
+            # Write tonnage per bay and deck/hold with the longitudinal moment
+            bay_positions = read_bay_positions(bay_positions_file) if bay_positions_file else None
+            weight_df = weight_distribution(analyzer.plan.records, analyzer.grid, bay_positions)
+            weight_df.to_excel(writer, index=False, sheet_name='Weight by Bay')
+            chart = start_weight_chart(weight_df, chart_file) if chart_file else None
+            lcg = cargo_lcg(weight_df)
+            if lcg is not None:
+                print(f"Cargo weight {weight_df['Weight'].sum():,.1f} t, LCG {lcg:+.1f} m from midship")
+
+            # Write moves per bay and the balanced split across quay cranes
+            bay_moves_df, crane_df = crane_split(records[records['Exclude'] != 'Yes'], cranes, moves_per_hour)
+            bay_moves_df.to_excel(writer, index=False, sheet_name='Crane Bays')
+            crane_df.to_excel(writer, index=False, sheet_name='Crane Split')
+            if len(crane_df):
+                print(f"Crane split: {len(crane_df)} cranes, longest {crane_df['Hours'].max():.1f} hours")
+
+            # Write boxes stowed above a box for an earlier port, with the restow count per bay
+            pod_ranks = discharge_ranks(records['POD'], analyzer.plan.header.port_rotation, terminal_port)
+            restows_df = find_restows(records, analyzer.grid, pod_ranks)
+            if len(restows_df):
+                restows_df.to_excel(writer, index=False, sheet_name='Restows')
+                restows_by_bay(restows_df).to_excel(writer, index=False, sheet_name='Restows by Bay')
+                print(f"{len(restows_df)} restows written to Restows sheet")
+
+            # Write duplicated container numbers and slots claimed twice, these inflate the summary
+            duplicates_df = analyzer.plan.duplicates
+            if len(duplicates_df):
+                duplicates_df.to_excel(writer, index=False, sheet_name='Duplicates')
+                print(f"{len(duplicates_df)} duplicate container / slot records written to Duplicates sheet")
+
+            # Write invalid container numbers (ISO 6346) to a separate sheet
+            validation_df.to_excel(writer, index=False, sheet_name='Validation')
+            if len(validation_df):
+                print(f"{len(validation_df)} invalid container numbers written to Validation sheet")
+
+            # Write list entries that did not reconcile with the plan
+            reconciliation_df.to_excel(writer, index=False, sheet_name='Reconciliation')
+            if len(reconciliation_df):
+                print(f"{len(reconciliation_df)} list entries written to Reconciliation sheet")
+
+            # Write over dimensions (cm) of every OOG container
+            oog_df = records[(records['OOG'] == 'Yes') & (records['Exclude'] != 'Yes')]
+            if len(oog_df):
+                oog_df[OOG_DETAIL_COLUMNS].to_excel(writer, index=False, sheet_name='OOG Detail')
+                print(f"{len(oog_df)} OOG containers written to OOG Detail sheet")
+
+            # Write DG breakdown by IMDG class and the DG manifest
+            if len(analyzer.dg_manifest):
+                dg_records = records[records['Exclude'] != 'Yes']
+                summarize_by_class(dg_records, analyzer.dg_manifest).to_excel(
+                    writer, index=False, sheet_name='DG Summary')
+                analyzer.dg_manifest.to_excel(writer, index=False, sheet_name='DG Manifest')
+                print(f"{dg_records['IMDG Class'].ne('').sum()} DG containers written to DG Manifest sheet")
+
+            # Write special remarks from the trailing remark section
+            remarks_df = analyzer.plan.remarks
+            if len(remarks_df):
+                remarks_df.to_excel(writer, index=False, sheet_name='Remarks')
 
         print(f"Summary successfully written to {output_file}")
+        if bay_plan_file:
+            BAY_PLAN_RENDERER.save(records, analyzer.grid, bay_plan_file, bay_plan_mode, plan_stem(asc_file))
+            print(f"Bay plan written to {bay_plan_file}")
+        if filtered_file:
+            write_filtered_asc(asc_file, filtered_file, records, analyzer.membership)
+        if chart is not None:
+            print(f"Weight chart written to {chart.result()}")
+        return reconciliation_df
         
     except Exception as e:
         print(f"Error creating summary: {str(e)}")
         raise
 
+def write_charges_sheet(writer: pd.ExcelWriter, summary_df: pd.DataFrame, tariff_file: str) -> pd.DataFrame:
+    """Price the summary groups with a tariff table and write them with the call total as 'Charges' sheet"""
+    charges_df = charges_with_total(apply_tariff(summary_df, read_tariff(tariff_file)))
+    charges_df.to_excel(writer, index=False, sheet_name='Charges')
+    unpriced = int(charges_df['Tariff Row'].isna().sum()) - 1
+    print(f"Charges: {charges_df['Amount'].iloc[-1]:,.2f} for {charges_df['Quantity'].iloc[-1]:,} containers"
+          + (f", {unpriced} groups without a tariff row" if unpriced else ""))
+    return charges_df
+
+def merge_summaries(summaries: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Merge the summary rows of several plans into one summary
+
+    Rows with the same grouping are added up, the largest over dimensions kept.
+    Rows stay in order of first appearance.
+    """
+    merged = pd.concat(summaries, ignore_index=True)
+    max_columns = [column for column in merged.columns if column.startswith('Max ')]
+    group_columns = [column for column in merged.columns if column not in SUMMARY_TOTAL_COLUMNS + max_columns]
+    merged = merged.groupby(group_columns, sort=False).agg(
+        **{column: (column, 'sum') for column in SUMMARY_TOTAL_COLUMNS},
+        **{column: (column, 'max') for column in max_columns}
+    ).reset_index()
+    return merged[summaries[0].columns]
+
+def build_call_totals(summary_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Quantity, TEU and weight of every operation per operator, with the totals of the call
+
+    Returns:
+        DataFrame with Operator Code, Operation and the SUMMARY_TOTAL_COLUMNS;
+        the billing operator comes first and 'Total' rows close the call
+    """
+    totals = summary_df.groupby(['Operator Code', 'Operation'])[SUMMARY_TOTAL_COLUMNS].sum().reset_index()
+    call = summary_df.groupby('Operation')[SUMMARY_TOTAL_COLUMNS].sum().reset_index()
+    call['Operator Code'] = 'Total'
+    grand_total = summary_df[SUMMARY_TOTAL_COLUMNS].sum().to_frame().T
+    grand_total[['Operator Code', 'Operation']] = 'Total'
+    report = pd.concat([totals, call, grand_total], ignore_index=True)
+
+    operators = [BILLING_OPERATOR] + sorted(set(totals['Operator Code']) - {BILLING_OPERATOR}) + ['Total']
+    operations = CALL_OPERATIONS + ['Total']
+    report = report.iloc[np.lexsort((rotation_rank(report['Operation'], operations),
+                                     rotation_rank(report['Operator Code'], operators)))]
+    return report[['Operator Code', 'Operation', 'Quantity', 'TEU', 'Weight', 'Reefer Plugs']].reset_index(drop=True)
+
+def create_call_summary(discharge_file: str, load_file: str,
+                        tpf_containers: List[str], local_containers: List[str],
+                        same_ts_containers: List[str], external_ts_containers: List[str],
+                        delete_containers: List[str], output_file: str = None, rules_file: str = None,
+                        terminal_port: str = DEFAULT_TERMINAL_PORT, tariff_file: str = None,
+                        auto_classify: bool = False, compare_file: str = None) -> pd.DataFrame:
+    """
+    Create one call-level Excel file from the discharge and load plan of a vessel call
+
+    Both plans are read and classified concurrently, the discharge plan as DIS
+    and the load plan as LOD (or both by POL/POD with auto_classify), and
+    their summaries merged. Per-plan outputs (stacks, crane split, charts,
+    bay plans, filtered ASC) are made with create_summary for each plan.
+
+    Args:
+        discharge_file: Path to the discharge ASC or BAPLIE file
+        load_file: Path to the load ASC or BAPLIE file
+        tpf_containers ... delete_containers: As for create_summary, applied to both plans
+        output_file: Path to output Excel file (optional, defaults to the discharge filename with '_call.xlsx')
+        rules_file: Path to classification rules file (optional, defaults to classification_rules.txt)
+        terminal_port: UN/LOCODE of the terminal (optional)
+        tariff_file: CSV or YAML tariff table to price the billing summary with (optional)
+        auto_classify: Classify both plans by POL/POD against terminal_port (the AUTO operation type)
+        compare_file: Existing summary workbook to check against the merged summary (optional)
+
+    Returns:
+        Call totals per operator and operation
+    """
+    rules = ClassificationRules.from_file(rules_file)
+    plans = {'DIS': discharge_file, 'LOD': load_file}
+    analyzers = {operation: ContainerAnalyzer('AUTO' if auto_classify else operation, tpf_containers,
+                                              local_containers, same_ts_containers, external_ts_containers,
+                                              delete_containers, rules, terminal_port)
+                 for operation in plans}
+    with ThreadPoolExecutor(max_workers=len(plans)) as executor:
+        futures = {operation: executor.submit(analyzers[operation].process_file, file_path)
+                   for operation, file_path in plans.items()}
+        summaries = {operation: future.result() for operation, future in futures.items()}
+
+    summary_df = merge_summaries(list(summaries.values()))
+    totals_df = build_call_totals(summary_df)
+    # A list entry only has to be in one of the two plans
+    records = pd.concat([analyzer.records for analyzer in analyzers.values()], ignore_index=True)
+    reconciliation_df = reconcile_lists(analyzers['DIS'].membership, records, BILLING_OPERATOR)
+
+    if output_file is None:
+        output_file = os.path.basename(plan_stem(discharge_file)) + '_call.xlsx'
+
+    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        totals_df.to_excel(writer, index=False, sheet_name='Call Totals')
+        is_billing = summary_df['Operator Code'] == BILLING_OPERATOR
+        write_summary_sheet(writer, summary_df[is_billing], 'Summary')
+        for operator_code, operator_df in summary_df[~is_billing].groupby('Operator Code', sort=True):
+            write_summary_sheet(writer, operator_df, f"Summary {operator_code or '(blank)'}")
+        if compare_file:
+            comparison_df = compare_summaries(read_summary_workbook(compare_file), summary_df)
+            comparison_df.to_excel(writer, index=False, sheet_name='Comparison')
+            print(f"{len(comparison_df)} groups differ from {os.path.basename(compare_file)} (Comparison sheet)")
+        if tariff_file:
+            write_charges_sheet(writer, summary_df[is_billing], tariff_file)
+        for operation, analyzer in analyzers.items():
+            plan_info = build_plan_info(analyzer.plan)
+            plan_info.loc[-1] = ['File', os.path.basename(plans[operation])]
+            plan_info.sort_index().to_excel(writer, index=False, sheet_name=f'Plan Info {operation}')
+        reconciliation_df.to_excel(writer, index=False, sheet_name='Reconciliation')
+
+    for row in totals_df[totals_df['Operator Code'] == 'Total'].itertuples():
+        print(f"{row.Operation}: {row.Quantity:,} containers, {row.TEU:,} TEU, {row.Weight:,} t")
+    print(f"Call summary successfully written to {output_file}")
+    return totals_df
+
+def create_archive_summaries(archive_file: str, operation_type: str,
+                             tpf_containers: List[str], local_containers: List[str],
+                             same_ts_containers: List[str], external_ts_containers: List[str],
+                             delete_containers: List[str], output_dir: str = None,
+                             with_chart: bool = False, with_bay_plan: bool = False, with_filtered: bool = False,
+                             max_workers: int = None, **options) -> Dict[str, pd.DataFrame]:
+    """
+    Create one summary per ASC/BAPLIE member of a zipped call package
+
+    Members are read straight from the archive and processed in parallel on a
+    thread pool. Output files are named after the archive and the member
+    ('calls_PLAN.xlsx', 'calls_PLAN_weight.png', ...).
+
+    Args:
+        archive_file: Path to zip archive
+        operation_type, tpf_containers ... delete_containers: As for create_summary, applied to every member
+        output_dir: Directory of the output files (optional, defaults to the archive directory)
+        with_chart: Write the weight per bay chart of every member
+        with_bay_plan: Write the bay plan of every member
+        with_filtered: Write the filtered ASC file of every member
+        max_workers: Number of worker threads (optional, ThreadPoolExecutor default)
+        options: Further create_summary arguments (rules_file, terminal_port, cranes, compare_file, ...)
+
+    Returns:
+        Reconciliation report of every member keyed by member path
+    """
+    members = list_archive_plans(archive_file)
+    if not members:
+        raise ValueError(f"No ASC or BAPLIE files in {archive_file}")
+    if output_dir is None:
+        output_dir = os.path.dirname(os.path.abspath(archive_file))
+    if with_chart or with_bay_plan:
+        # Charts and bay plans are painted on the workers; the Qt application must come from this thread
+        ensure_gui_application()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for member in members:
+            stem = os.path.join(output_dir, os.path.basename(plan_stem(member)))
+            futures[member] = executor.submit(
+                create_summary, member, operation_type, tpf_containers, local_containers,
+                same_ts_containers, external_ts_containers, delete_containers,
+                output_file=stem + '.xlsx',
+                chart_file=stem + '_weight.png' if with_chart else None,
+                bay_plan_file=stem + '_bayplan.png' if with_bay_plan else None,
+                filtered_file=stem + '_filtered.ASC' if with_filtered else None,
+                **options)
+        reports = {member: future.result() for member, future in futures.items()}
+    print(f"{len(reports)} summaries written for {archive_file}")
+    return reports
+
+
+def write_filtered_asc(asc_file: str, filtered_file: str, records: pd.DataFrame,
+                       membership: pd.DataFrame) -> Optional[int]:
+    """
+    Write the plan without the containers of the Delete list as an ASC file
+
+    Returns:
+        Number of container records written, None for BAPLIE input (no ASC source lines to copy)
+    """
+    if is_edifact(asc_file):
+        print(f"Filtered ASC skipped: {asc_file} is not an ASC file")
+        return None
+    deleted = membership.loc[membership['List'] == 'Delete', 'Container']
+    is_deleted = pd.Series(normalize_container_numbers(records['Container Number'])).isin(deleted).to_numpy()
+    written, unfiltered = write_filtered_plan(asc_file, filtered_file, records.loc[~is_deleted, 'Line'])
+    for name in unfiltered:
+        print(f"Warning: section '{name}' of {asc_file} cannot be matched to container records, copied unchanged")
+    print(f"Filtered ASC written to {filtered_file} ({written:,} records, {int(is_deleted.sum()):,} deleted)")
+    return written
+
+
 class DropArea(QFrame):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -295,27 +658,18 @@ class DropArea(QFrame):
         
         self.file_path = None
         
-    def count_containers(self, file_path: str) -> tuple:
-        """Count the number of MSC containers in the ASC file, separated by full/empty status"""
-        full_count = 0
-        empty_count = 0
+    def count_containers(self, file_path: str) -> pd.DataFrame:
+        """Count the containers of every operator in the ASC file, separated by full/empty status"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if not line.startswith('$'):  # Skip header lines
-                        # Check if operator code is MSC (position 19-22)
-                        operator_code = line[19:22].strip()
-                        if operator_code == 'MSC':
-                            # Check full/empty status (position 51-52)
-                            full_empty = line[51:52].strip()
-                            if full_empty == 'F':
-                                full_count += 1
-                            elif full_empty == 'E':
-                                empty_count += 1
+            # A zipped call package counts the containers of all its plans
+            plan_files = list_archive_plans(file_path) if is_archive(file_path) else [file_path]
+            records = pd.concat([(read_baplie(path) if is_edifact(path) else read_plan(path)).records
+                                 for path in plan_files], ignore_index=True)
+            counts = pd.crosstab(records['Operator Code'], records['Full/Empty'])
         except Exception as e:
             print(f"Error counting containers: {str(e)}")
-            return (0, 0)
-        return (full_count, empty_count)
+            counts = pd.DataFrame()
+        return counts.reindex(columns=['F', 'E'], fill_value=0)
         
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
@@ -326,8 +680,22 @@ class DropArea(QFrame):
         if files:
             self.file_path = files[0]
             filename = os.path.basename(self.file_path)
-            full_count, empty_count = self.count_containers(self.file_path)
+
+            # Reject truncated or padded files from the header and file size before reading every record
+            problems = check_plan_file(self.file_path)
+            if problems:
+                self.label.setText(filename)
+                self.label.setStyleSheet("color: #dc3545;")
+                self.count_label.setText("파일이 불완전하여 컨테이너 수를 세지 않았습니다")
+                self.count_label.setStyleSheet("color: #dc3545;")
+                QMessageBox.warning(self, 'Warning', 'ASC 파일이 불완전합니다:\n' + '\n'.join(problems))
+                return
+
+            counts = self.count_containers(self.file_path)
+            full_count = int(counts['F'].get(BILLING_OPERATOR, 0))
+            empty_count = int(counts['E'].get(BILLING_OPERATOR, 0))
             total_count = full_count + empty_count
+            other_counts = counts.drop(index=BILLING_OPERATOR, errors='ignore').sum(axis=1)
             
             self.label.setText(filename)
             self.label.setStyleSheet("color: #28a745;")  # Green color for success
@@ -335,19 +703,28 @@ class DropArea(QFrame):
                 f"<span style='font-size:20pt; font-weight:bold; color:red;'>MSC 컨테이너 수: {total_count:,}개<br>"
                 f"Full: {full_count:,}개<br>"
                 f"Empty: {empty_count:,}개</span>"
+                + ("<br>기타 운영사: " + ", ".join(
+                    f"{operator or '(blank)'} {count:,}개" for operator, count in other_counts.items()
+                ) if len(other_counts) else "")
             )
             self.count_label.setStyleSheet("color: #28a745;")
 
 class ContainerTab(QWidget):
+    # Emitted when typed or imported containers change
+    containers_changed = pyqtSignal()
+
     def __init__(self, title, parent=None):
         super().__init__(parent)
+        self.setAcceptDrops(True)
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(10)
         
-        label = QLabel(f"{title} (한 줄에 하나의 컨테이너 번호):")
+        label = QLabel(f"{title} (한 줄에 하나의 컨테이너 번호, CSV/Excel/TXT 파일 드래그 앤 드롭 가능):")
         self.text_edit = QTextEdit()
         self.text_edit.setMinimumHeight(200)
+        # Let dropped files reach the tab instead of being pasted as text
+        self.text_edit.setAcceptDrops(False)
         self.text_edit.setStyleSheet("""
             QTextEdit {
                 background-color: white;
@@ -357,12 +734,97 @@ class ContainerTab(QWidget):
             }
         """)
         
+        self.invalid_label = QLabel("")
+        self.invalid_label.setStyleSheet("color: #dc3545;")
+        self.invalid_count = 0
+        self.text_edit.textChanged.connect(self.highlight_invalid_containers)
+        self.text_edit.textChanged.connect(self.containers_changed.emit)
+        
+        # Containers imported from files are kept out of the text widget
+        self.imported_files = []
+        self.imported_containers = np.array([], dtype=str)
+        self.imported_invalid_count = 0
+        import_layout = QHBoxLayout()
+        self.import_label = QLabel("")
+        self.clear_import_btn = QPushButton('가져온 파일 지우기')
+        self.clear_import_btn.clicked.connect(self.clear_imported_files)
+        self.clear_import_btn.hide()
+        import_layout.addWidget(self.import_label)
+        import_layout.addStretch()
+        import_layout.addWidget(self.clear_import_btn)
+        
         layout.addWidget(label)
         layout.addWidget(self.text_edit)
+        layout.addLayout(import_layout)
+        layout.addWidget(self.invalid_label)
         layout.addStretch()
         
     def get_container_list(self):
-        return [line.strip() for line in self.text_edit.toPlainText().split('\n') if line.strip()]
+        typed = [line.strip() for line in self.text_edit.toPlainText().split('\n') if line.strip()]
+        return typed + self.imported_containers.tolist()
+
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event: QDropEvent):
+        files = [url.toLocalFile() for url in event.mimeData().urls()]
+        files = [f for f in files if os.path.splitext(f)[1].lower() in LIST_FILE_EXTENSIONS]
+        if not files:
+            QMessageBox.warning(self, 'Error', 'CSV, Excel 또는 TXT 파일만 가져올 수 있습니다.')
+            return
+        try:
+            self.import_files(files)
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'파일을 읽을 수 없습니다: {str(e)}')
+
+    def import_files(self, file_paths: List[str]):
+        """Read container list files straight into the imported container array"""
+        self.imported_containers = np.concatenate([self.imported_containers, read_container_files(file_paths)])
+        self.imported_files.extend(os.path.basename(f) for f in file_paths)
+        self.imported_invalid_count = int((~validate_container_numbers(self.imported_containers)['Valid']).sum())
+
+        self.import_label.setText(
+            f"가져온 파일: {', '.join(self.imported_files)} ({len(self.imported_containers):,}개)"
+        )
+        self.clear_import_btn.show()
+        self.update_invalid_label()
+        self.containers_changed.emit()
+
+    def clear_imported_files(self):
+        """Remove all containers imported from files"""
+        self.imported_files = []
+        self.imported_containers = np.array([], dtype=str)
+        self.imported_invalid_count = 0
+        self.import_label.setText("")
+        self.clear_import_btn.hide()
+        self.update_invalid_label()
+        self.containers_changed.emit()
+
+    def update_invalid_label(self):
+        """Show the number of typed and imported containers that fail validation"""
+        total_invalid = self.invalid_count + self.imported_invalid_count
+        self.invalid_label.setText(f"잘못된 컨테이너 번호: {total_invalid:,}개" if total_invalid else "")
+
+    def highlight_invalid_containers(self):
+        """Highlight lines whose container number fails ISO 6346 validation"""
+        lines = self.text_edit.toPlainText().split('\n')
+        line_numbers = [idx for idx, line in enumerate(lines) if line.strip()]
+        validation = validate_container_numbers([lines[idx] for idx in line_numbers])
+
+        document = self.text_edit.document()
+        invalid_color = QColor('#f8d7da')
+        selections = []
+        for idx in np.flatnonzero(~validation['Valid'].to_numpy()):
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setBackground(invalid_color)
+            selection.format.setProperty(QTextFormat.FullWidthSelection, True)
+            selection.cursor = QTextCursor(document.findBlockByNumber(line_numbers[idx]))
+            selections.append(selection)
+        self.text_edit.setExtraSelections(selections)
+
+        self.invalid_count = len(selections)
+        self.update_invalid_label()
 
 class ContainerAnalyzerGUI(QMainWindow):
     def __init__(self):
@@ -387,14 +849,29 @@ class ContainerAnalyzerGUI(QMainWindow):
         self.op_group = QButtonGroup(self)
         self.discharge_radio = QRadioButton('Discharge')
         self.load_radio = QRadioButton('Load')
+        self.auto_radio = QRadioButton(f'Auto ({DEFAULT_TERMINAL_PORT})')
+        self.auto_radio.setToolTip('POL/POD 기준으로 컨테이너별 DIS/LOD/TSD/TSL 자동 분류')
         self.discharge_radio.setChecked(True)  # Default selection
         
         self.op_group.addButton(self.discharge_radio)
         self.op_group.addButton(self.load_radio)
+        self.op_group.addButton(self.auto_radio)
         
         op_layout.addWidget(self.discharge_radio)
         op_layout.addWidget(self.load_radio)
+        op_layout.addWidget(self.auto_radio)
         op_layout.addStretch()
+
+        # Optional weight per bay chart next to the Excel file
+        self.chart_check = QCheckBox('Bay 중량 차트 (PNG)')
+        op_layout.addWidget(self.chart_check)
+
+        # Optional bay plan image, colored by the selected field
+        self.bay_plan_check = QCheckBox('Bay Plan 이미지')
+        self.bay_plan_mode = QComboBox()
+        self.bay_plan_mode.addItems(COLOR_MODES)
+        op_layout.addWidget(self.bay_plan_check)
+        op_layout.addWidget(self.bay_plan_mode)
         
         main_layout.addLayout(op_layout)
         
@@ -402,6 +879,11 @@ class ContainerAnalyzerGUI(QMainWindow):
         main_layout.addWidget(QLabel('ASC File:'))
         self.drop_area = DropArea()
         main_layout.addWidget(self.drop_area)
+
+        # Optional load plan of the same call: the first file is then the discharge plan
+        main_layout.addWidget(QLabel('Load ASC File (선택 - 위 파일은 Discharge, Call 통합 Summary):'))
+        self.load_drop_area = DropArea()
+        main_layout.addWidget(self.load_drop_area)
         
         # Tab widget
         self.tab_widget = QTabWidget()
@@ -431,12 +913,12 @@ class ContainerAnalyzerGUI(QMainWindow):
         self.external_ts_tab = ContainerTab('External TS')
         self.delete_tab = ContainerTab('Delete')
         
-        # Connect text changed signals to update count
-        self.tpf_tab.text_edit.textChanged.connect(lambda: self.update_container_counts())
-        self.local_tab.text_edit.textChanged.connect(lambda: self.update_container_counts())
-        self.same_ts_tab.text_edit.textChanged.connect(lambda: self.update_container_counts())
-        self.external_ts_tab.text_edit.textChanged.connect(lambda: self.update_container_counts())
-        self.delete_tab.text_edit.textChanged.connect(lambda: self.update_container_counts())
+        # Connect container changed signals to update count
+        self.tpf_tab.containers_changed.connect(lambda: self.update_container_counts())
+        self.local_tab.containers_changed.connect(lambda: self.update_container_counts())
+        self.same_ts_tab.containers_changed.connect(lambda: self.update_container_counts())
+        self.external_ts_tab.containers_changed.connect(lambda: self.update_container_counts())
+        self.delete_tab.containers_changed.connect(lambda: self.update_container_counts())
         
         self.tab_widget.addTab(self.tpf_tab, 'TPF Containers')
         self.tab_widget.addTab(self.local_tab, 'Local')
@@ -463,8 +945,39 @@ class ContainerAnalyzerGUI(QMainWindow):
             }
         """)
         self.process_btn.clicked.connect(self.process_data)
+
+        # Optional existing summary workbook to check the result against
+        compare_layout = QHBoxLayout()
+        self.compare_file = None
+        self.compare_btn = QPushButton('비교할 Summary 선택')
+        self.compare_btn.clicked.connect(self.select_compare_file)
+        self.compare_label = QLabel('')
+        compare_layout.addWidget(self.compare_btn)
+        compare_layout.addWidget(self.compare_label)
+        compare_layout.addStretch()
+
+        # Optional tariff table for the Charges sheet
+        self.tariff_file = None
+        self.tariff_btn = QPushButton('요율표 선택 (CSV/YAML)')
+        self.tariff_btn.clicked.connect(self.select_tariff_file)
+        self.tariff_label = QLabel('')
+        compare_layout.addWidget(self.tariff_btn)
+        compare_layout.addWidget(self.tariff_label)
+        main_layout.addLayout(compare_layout)
         main_layout.addWidget(self.process_btn)
 
+    def select_compare_file(self):
+        """Pick an existing summary workbook to compare with; cancelling clears the choice"""
+        file_path, _ = QFileDialog.getOpenFileName(self, '비교할 Summary 선택', '', 'Excel (*.xlsx)')
+        self.compare_file = file_path or None
+        self.compare_label.setText(os.path.basename(file_path) if file_path else '')
+
+    def select_tariff_file(self):
+        """Pick a tariff table for the Charges sheet; cancelling clears the choice"""
+        file_path, _ = QFileDialog.getOpenFileName(self, '요율표 선택', '', 'Tariff (*.csv *.yaml *.yml)')
+        self.tariff_file = file_path or None
+        self.tariff_label.setText(os.path.basename(file_path) if file_path else '')
+
     def update_container_counts(self):
         """Update the container count labels"""
         # Get container counts from each tab
@@ -493,6 +1006,19 @@ class ContainerAnalyzerGUI(QMainWindow):
             return ('TSD' if is_discharge else 'TSL', True)
         return (None, False)
         
+    def show_bay_plan(self, image_path: str):
+        """Show the rendered bay plan in a scrollable window"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f'Bay Plan - {os.path.basename(image_path)}')
+        dialog.resize(1200, 800)
+        label = QLabel()
+        label.setPixmap(QPixmap(image_path))
+        scroll = QScrollArea()
+        scroll.setWidget(label)
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(scroll)
+        dialog.show()
+
     def process_data(self):
         try:
             # Get ASC file path
@@ -513,15 +1039,66 @@ class ContainerAnalyzerGUI(QMainWindow):
             delete_containers = self.delete_tab.get_container_list()
             
             # Get operation type based on radio selection
-            operation_type = 'DIS' if self.discharge_radio.isChecked() else 'LOD'
+            if self.auto_radio.isChecked():
+                operation_type = 'AUTO'
+            else:
+                operation_type = 'DIS' if self.discharge_radio.isChecked() else 'LOD'
             
+            # Discharge and load plan of one call give one call-level workbook
+            load_file = self.load_drop_area.file_path
+            if load_file:
+                if self.chart_check.isChecked() or self.bay_plan_check.isChecked():
+                    QMessageBox.warning(self, 'Warning', 'Call 통합 Summary에는 Bay 중량 차트와 Bay Plan 이미지가 '
+                                                         '만들어지지 않습니다. 체크를 해제하거나 파일별로 실행하세요.')
+                    return
+                output_path = plan_stem(asc_file) + '_call.xlsx'
+                totals_df = create_call_summary(
+                    asc_file, load_file, tpf_containers, local_containers, same_ts_containers,
+                    external_ts_containers, delete_containers, output_file=output_path,
+                    tariff_file=self.tariff_file, auto_classify=operation_type == 'AUTO',
+                    compare_file=self.compare_file
+                )
+                call_total = totals_df.iloc[-1]
+                message = (f'Call Summary가 성공적으로 생성되었습니다:\n{output_path}\n\n'
+                           f'총 {int(call_total["Quantity"]):,}개, {int(call_total["TEU"]):,} TEU, '
+                           f'{int(call_total["Weight"]):,} t')
+                if len(delete_containers):
+                    message += '\n\n삭제 컨테이너를 뺀 ASC 파일은 Call 통합 모드에서 만들지 않습니다 (파일별로 실행)'
+                QMessageBox.information(self, 'Success', message)
+                return
+
+            # A zipped call package gives one summary per plan next to the archive
+            if is_archive(asc_file):
+                reports = create_archive_summaries(
+                    asc_file, operation_type, tpf_containers, local_containers, same_ts_containers,
+                    external_ts_containers, delete_containers,
+                    with_chart=self.chart_check.isChecked(),
+                    with_bay_plan=self.bay_plan_check.isChecked(),
+                    with_filtered=bool(len(delete_containers)),
+                    bay_plan_mode=self.bay_plan_mode.currentText(),
+                    tariff_file=self.tariff_file,
+                    compare_file=self.compare_file
+                )
+                not_in_plan = sum(int((report['Issue'] == 'Not in plan').sum()) for report in reports.values())
+                message = (f'{len(reports)}개 ASC 파일의 Summary가 생성되었습니다:\n'
+                           + '\n'.join(os.path.basename(plan_stem(member)) + '.xlsx' for member in reports))
+                if not_in_plan:
+                    message += f'\n\nASC 파일에 없는 목록 컨테이너: {not_in_plan:,}건 (Reconciliation 시트 참고)'
+                if self.compare_file:
+                    message += f'\n\n{os.path.basename(self.compare_file)}와 비교한 결과는 파일별 Comparison 시트 참고'
+                QMessageBox.information(self, 'Success', message)
+                return
+
             # Create output file path using ASC filename
-            asc_filename = os.path.basename(asc_file)
-            output_file = asc_filename.replace('.ASC', '.xlsx')
-            output_path = os.path.join(os.path.dirname(asc_file), output_file)
+            output_path = plan_stem(asc_file) + '.xlsx'
+            chart_path = os.path.splitext(output_path)[0] + '_weight.png' if self.chart_check.isChecked() else None
+            bay_plan_path = os.path.splitext(output_path)[0] + '_bayplan.png' if self.bay_plan_check.isChecked() else None
+            # Planners get the plan back without the deleted boxes
+            filtered_path = (os.path.splitext(output_path)[0] + '_filtered.ASC'
+                             if len(delete_containers) and not is_edifact(asc_file) else None)
             
             # Create summary
-            create_summary(
+            reconciliation_df = create_summary(
                 asc_file=asc_file,
                 operation_type=operation_type,
                 tpf_containers=tpf_containers,
@@ -529,19 +1106,157 @@ class ContainerAnalyzerGUI(QMainWindow):
                 same_ts_containers=same_ts_containers,
                 external_ts_containers=external_ts_containers,
                 delete_containers=delete_containers,
-                output_file=output_path
+                output_file=output_path,
+                chart_file=chart_path,
+                bay_plan_file=bay_plan_path,
+                bay_plan_mode=self.bay_plan_mode.currentText(),
+                filtered_file=filtered_path,
+                compare_file=self.compare_file,
+                tariff_file=self.tariff_file
             )
             
+            message = f'Summary가 성공적으로 생성되었습니다:\n{output_path}'
+            not_in_plan = int((reconciliation_df['Issue'] == 'Not in plan').sum())
+            if not_in_plan:
+                message += f'\n\nASC 파일에 없는 목록 컨테이너: {not_in_plan:,}개 (Reconciliation 시트 참고)'
+            if filtered_path:
+                message += f'\n\n삭제 컨테이너를 뺀 ASC 파일:\n{filtered_path}'
+            if self.compare_file:
+                message += f'\n\n{os.path.basename(self.compare_file)}와 비교한 결과는 Comparison 시트 참고'
+            if self.tariff_file:
+                message += '\n\n요율 적용 금액과 Call 합계는 Charges 시트 참고'
+            
             QMessageBox.information(
                 self, 
                 'Success', 
-                f'Summary가 성공적으로 생성되었습니다:\n{output_path}'
+                message
             )
+            if bay_plan_path:
+                self.show_bay_plan(bay_plan_path)
                 
         except Exception as e:
             QMessageBox.critical(self, 'Error', str(e))
 
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """Parse command line options for running without the GUI"""
+    parser = argparse.ArgumentParser(description='Create a container summary from an ASC file')
+    parser.add_argument('asc_file', nargs='?',
+                        help='ASC or BAPLIE file, optionally .gz compressed, or a .zip of them (starts the GUI when omitted)')
+    parser.add_argument('--operation', choices=['DIS', 'LOD', 'AUTO'], default='DIS',
+                        help='Operation type, AUTO derives it per container from POL/POD')
+    parser.add_argument('--load', metavar='FILE',
+                        help='Load plan of the same call: asc_file is read as the discharge plan and one '
+                             'call-level workbook is written')
+    parser.add_argument('--terminal', default=DEFAULT_TERMINAL_PORT,
+                        help=f'Terminal UN/LOCODE for --operation AUTO (default {DEFAULT_TERMINAL_PORT})')
+    parser.add_argument('--tpf', action='append', default=[], metavar='FILE', help='TPF container list file')
+    parser.add_argument('--local', action='append', default=[], metavar='FILE', help='Local container list file')
+    parser.add_argument('--same-ts', action='append', default=[], metavar='FILE', help='Same TS container list file')
+    parser.add_argument('--external-ts', action='append', default=[], metavar='FILE',
+                        help='External TS container list file')
+    parser.add_argument('--delete', action='append', default=[], metavar='FILE',
+                        help='Container list file to exclude from the summary')
+    parser.add_argument('--output', help='Output Excel file (defaults to ASC filename with .xlsx extension), '
+                                         'the output directory for a .zip')
+    parser.add_argument('--rules', help='Classification rules file (defaults to classification_rules.txt)')
+    parser.add_argument('--stack-limits', nargs=4, type=float, metavar=('DECK20', 'DECK40', 'HOLD20', 'HOLD40'),
+                        help='Stack weight limits in tons of 20\' and 40\' stacks on deck and in the hold '
+                             '(default ' + ' '.join(f'{DEFAULT_STACK_WEIGHT_LIMITS[key]:g}'
+                                                    for key in STACK_LIMIT_KEYS) + ')')
+    parser.add_argument('--cranes', type=int, default=DEFAULT_CRANES,
+                        help=f'Number of quay cranes for the crane split (default {DEFAULT_CRANES})')
+    parser.add_argument('--crane-rate', type=float, default=DEFAULT_MOVES_PER_HOUR,
+                        help=f'Gross moves per crane hour (default {DEFAULT_MOVES_PER_HOUR:g})')
+    parser.add_argument('--bay-positions', metavar='FILE', help='CSV with Bay and LCG (m forward of midship) columns')
+    parser.add_argument('--chart', metavar='FILE', help='Write the weight per bay chart to a PNG file')
+    parser.add_argument('--bay-plan', metavar='FILE', help='Write the bay plan cross-sections to a PNG file')
+    parser.add_argument('--bay-plan-color', choices=COLOR_MODES, default='POD', help='What the bay plan is colored by')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='Existing summary workbook to check the computed summary against')
+    parser.add_argument('--tariff', metavar='FILE',
+                        help='Tariff table (CSV or YAML) to write the Charges sheet with')
+    parser.add_argument('--filtered-asc', metavar='FILE',
+                        help='Write the plan without the --delete containers to an ASC file')
+    parser.add_argument('--check', action='store_true', help='Only check the ASC file integrity')
+    args = parser.parse_args(argv)
+    if args.load:
+        # The call workbook has no per-plan sheets or files
+        per_plan = [option for option, value in [
+            ('--chart', args.chart), ('--bay-plan', args.bay_plan), ('--filtered-asc', args.filtered_asc),
+            ('--stack-limits', args.stack_limits), ('--bay-positions', args.bay_positions),
+            ('--cranes', args.cranes != DEFAULT_CRANES), ('--crane-rate', args.crane_rate != DEFAULT_MOVES_PER_HOUR)
+        ] if value]
+        if per_plan:
+            parser.error(f"{', '.join(per_plan)} cannot be used with --load; run each plan without --load instead")
+        if args.operation == 'LOD':
+            parser.error("--load reads asc_file as the discharge plan; use --operation DIS or AUTO")
+    return args
+
+def run_cli(args: argparse.Namespace) -> None:
+    """Create a summary from command line options"""
+    if args.check:
+        problems = check_plan_file(args.asc_file)
+        for problem in problems:
+            print(problem)
+        if problems:
+            sys.exit(1)
+        print(f"{args.asc_file}: OK")
+        return
+
+    options = dict(
+        rules_file=args.rules,
+        terminal_port=args.terminal,
+        stack_weight_limits=dict(zip(STACK_LIMIT_KEYS, args.stack_limits)) if args.stack_limits else None,
+        cranes=args.cranes,
+        moves_per_hour=args.crane_rate,
+        bay_positions_file=args.bay_positions,
+        bay_plan_mode=args.bay_plan_color,
+        tariff_file=args.tariff
+    )
+    lists = dict(
+        tpf_containers=read_container_files(args.tpf),
+        local_containers=read_container_files(args.local),
+        same_ts_containers=read_container_files(args.same_ts),
+        external_ts_containers=read_container_files(args.external_ts),
+        delete_containers=read_container_files(args.delete)
+    )
+    if args.load:
+        create_call_summary(args.asc_file, args.load, **lists, output_file=args.output,
+                            rules_file=args.rules, terminal_port=args.terminal, tariff_file=args.tariff,
+                            auto_classify=args.operation == 'AUTO', compare_file=args.compare)
+        return
+
+    if is_archive(args.asc_file):
+        # One summary per member; --output is the output directory and the file options only switch outputs on
+        create_archive_summaries(
+            args.asc_file, args.operation, **lists,
+            output_dir=args.output or os.getcwd(),
+            with_chart=bool(args.chart),
+            with_bay_plan=bool(args.bay_plan),
+            with_filtered=bool(args.filtered_asc),
+            compare_file=args.compare,
+            **options
+        )
+        return
+
+    create_summary(
+        asc_file=args.asc_file,
+        operation_type=args.operation,
+        **lists,
+        output_file=args.output,
+        chart_file=args.chart,
+        bay_plan_file=args.bay_plan,
+        filtered_file=args.filtered_asc,
+        compare_file=args.compare,
+        **options
+    )
+
 if __name__ == '__main__':
+    args = parse_args(sys.argv[1:])
+    if args.asc_file:
+        run_cli(args)
+        sys.exit(0)
+
     app = QApplication(sys.argv)
     app.setStyle('Fusion')  # Modern style
     window = ContainerAnalyzerGUI()
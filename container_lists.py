@@ -0,0 +1,145 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List
+
+from iso6346 import normalize_container_numbers
+
+MEMBERSHIP_COLUMNS = ['List', 'Entry', 'Container']
+
+# File types that can be imported as container lists
+LIST_FILE_EXTENSIONS = ('.csv', '.txt', '.xlsx', '.xls')
+
+# Number of rows used to decide which column holds the container numbers
+_DETECTION_ROWS = 200
+_CONTAINER_PATTERN = r'^[A-Z]{4}[0-9]{7}$'
+
+
+def _pick_container_column(df: pd.DataFrame) -> str:
+    """Return the column whose leading rows look most like container numbers"""
+    head = df.head(_DETECTION_ROWS)
+    scores = {
+        column: pd.Series(normalize_container_numbers(head[column].dropna())).str.match(_CONTAINER_PATTERN).sum()
+        for column in df.columns
+    }
+    return max(scores, key=scores.get)
+
+
+def _sniff_delimiter(file_path: str) -> str:
+    """Guess the CSV delimiter from the first line so the C parser can be used"""
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        first_line = f.readline()
+    counts = {delimiter: first_line.count(delimiter) for delimiter in (',', ';', '\t')}
+    return max(counts, key=counts.get)
+
+
+def read_container_file(file_path: str) -> np.ndarray:
+    """
+    Read a container list exported from the TOS (CSV, Excel or plain text)
+
+    Args:
+        file_path: Path to .csv, .txt, .xlsx or .xls file
+
+    Returns:
+        Array of normalized container numbers in file order, blank entries dropped
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in LIST_FILE_EXTENSIONS:
+        raise ValueError(f"Unsupported container list file: {file_path}")
+
+    if extension == '.txt':
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            values = f.read().splitlines()
+    else:
+        if extension == '.csv':
+            df = pd.read_csv(file_path, header=None, dtype=str, sep=_sniff_delimiter(file_path),
+                             encoding_errors='replace')
+        else:
+            df = pd.read_excel(file_path, header=None, dtype=str)
+        if df.empty:
+            return np.array([], dtype=str)
+        values = df[_pick_container_column(df)].dropna()
+
+    containers = normalize_container_numbers(values)
+    containers = containers[containers != '']
+
+    # Drop a header row such as 'CNTR NO' above the container numbers
+    if len(containers) and not pd.Series(containers[:1]).str.match(_CONTAINER_PATTERN).iloc[0]:
+        if pd.Series(containers[1:_DETECTION_ROWS]).str.match(_CONTAINER_PATTERN).any():
+            containers = containers[1:]
+    return containers
+
+
+def read_container_files(file_paths: List[str]) -> np.ndarray:
+    """Read and concatenate several container list files"""
+    arrays = [read_container_file(file_path) for file_path in file_paths]
+    return np.concatenate(arrays) if arrays else np.array([], dtype=str)
+
+
+def build_membership_index(container_lists: Dict[str, Iterable[str]]) -> pd.DataFrame:
+    """
+    Build the normalized membership index of the classification lists
+
+    Args:
+        container_lists: Container numbers keyed by list name ('TPF', 'Local', ...)
+
+    Returns:
+        DataFrame with 'List', 'Entry' (1-based position in the list) and
+        normalized 'Container' columns, blank entries dropped
+    """
+    frames = []
+    for list_name, containers in container_lists.items():
+        normalized = normalize_container_numbers(containers)
+        frame = pd.DataFrame({
+            'List': list_name,
+            'Entry': np.arange(1, len(normalized) + 1),
+            'Container': normalized
+        })
+        frames.append(frame[frame['Container'] != ''])
+
+    if not frames:
+        return pd.DataFrame(columns=MEMBERSHIP_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def reconcile_lists(membership: pd.DataFrame, records: pd.DataFrame, operator_code: str = 'MSC') -> pd.DataFrame:
+    """
+    Hash join the membership index with the plan index and report list entries that need attention
+
+    Args:
+        membership: Membership index from build_membership_index
+        records: Container records from asc_plan.read_records
+        operator_code: Operator the summary is made for
+
+    Returns:
+        DataFrame with one row per problem: entries not found in the plan,
+        entries in more than one list and entries of another operator
+    """
+    plan_index = pd.DataFrame({
+        'Container': normalize_container_numbers(records['Container Number']),
+        'Plan Line': records['Line'].to_numpy(),
+        'Operator Code': records['Operator Code'].to_numpy()
+    }).drop_duplicates('Container')
+
+    joined = membership.merge(plan_index, on='Container', how='left')
+
+    # Containers that appear in more than one list; names are only joined for those
+    distinct = membership.drop_duplicates(['Container', 'List'])
+    list_count = joined['Container'].map(distinct['Container'].value_counts())
+    in_multiple_lists = (list_count > 1).to_numpy()
+    shared = distinct[distinct['Container'].isin(joined.loc[in_multiple_lists, 'Container'])]
+    joined['Lists'] = joined['Container'].map(shared.groupby('Container')['List'].agg(', '.join))
+
+    not_in_plan = joined['Plan Line'].isna()
+    other_operator = ~not_in_plan & (joined['Operator Code'] != operator_code)
+
+    issues = [
+        joined.loc[not_in_plan].assign(Issue='Not in plan', Detail=''),
+        joined.loc[in_multiple_lists].assign(Issue='In multiple lists', Detail=joined.loc[in_multiple_lists, 'Lists']),
+        joined.loc[other_operator].assign(Issue=f'Not {operator_code}',
+                                          Detail=joined.loc[other_operator, 'Operator Code'])
+    ]
+    report = pd.concat(issues, ignore_index=True)
+    report['Entry'] = report['Entry'].astype('Int64')
+    report['Plan Line'] = report['Plan Line'].astype('Int64')
+    return report[['Issue', 'List', 'Entry', 'Container', 'Plan Line', 'Detail']]
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable
+
+# Attribute columns of the type table
+TYPE_COLUMNS = ['Length', 'Height', 'TEU', 'Reefer', 'Open Top', 'Flat Rack']
+
+# CASP type code: length in feet followed by a two letter type ('40HC')
+CASP_LENGTHS = ['20', '40', '45']
+CASP_TYPES: Dict[str, tuple] = {
+    # Type: (height in feet, equipment)
+    'DV': (8.5, ''),             # Dry van
+    'GP': (8.5, ''),             # General purpose
+    'HC': (9.5, ''),             # High cube
+    'HQ': (9.5, ''),
+    'HT': (8.5, ''),             # Hard top
+    'TK': (8.5, ''),             # Tank
+    'RF': (8.5, 'Reefer'),
+    'RE': (8.5, 'Reefer'),
+    'HR': (9.5, 'Reefer'),       # High cube reefer
+    'RH': (9.5, 'Reefer'),
+    'OT': (8.5, 'Open Top'),
+    'OH': (9.5, 'Open Top'),
+    'FL': (8.5, 'Flat Rack'),
+    'FR': (8.5, 'Flat Rack'),
+    'PF': (8.5, 'Flat Rack'),    # Platform
+}
+
+# ISO 6346 size-type code ('45G1'): length, height and type group characters
+ISO_LENGTHS = {'1': 10, '2': 20, '3': 30, '4': 40, 'L': 45, 'M': 48}
+ISO_HEIGHTS = {'0': 8.0, '2': 8.5, '4': 9.0, '5': 9.5, '6': 9.5, '8': 4.25, '9': 4.0}
+ISO_EQUIPMENT = {'R': 'Reefer', 'H': 'Reefer', 'U': 'Open Top', 'P': 'Flat Rack'}
+
+
+def describe_type(code: str) -> Dict[str, object]:
+    """
+    Decode a single CASP ('40HR') or ISO 6346 ('45R1') container type code
+
+    Unknown codes keep the length of a leading '20'/'40'/'45' with no flags set.
+    """
+    length, height, equipment = None, None, ''
+    if len(code) == 4 and code[:2].isdigit() and code[2:] in CASP_TYPES:
+        length = int(code[:2])
+        height, equipment = CASP_TYPES[code[2:]]
+    elif len(code) == 4 and code[0] in ISO_LENGTHS and code[1] in ISO_HEIGHTS and code[2].isalpha():
+        length = ISO_LENGTHS[code[0]]
+        height = ISO_HEIGHTS[code[1]]
+        equipment = ISO_EQUIPMENT.get(code[2], '')
+    elif code[:2] in CASP_LENGTHS:
+        length = int(code[:2])
+
+    return {
+        'Length': length if length is not None else np.nan,
+        'Height': height if height is not None else np.nan,
+        # 20' and shorter boxes count one TEU, longer boxes two
+        'TEU': 0 if length is None else (1 if length <= 20 else 2),
+        'Reefer': equipment == 'Reefer',
+        'Open Top': equipment == 'Open Top',
+        'Flat Rack': equipment == 'Flat Rack',
+    }
+
+
+def build_type_table(codes: Iterable[str]) -> pd.DataFrame:
+    """Lookup table of type attributes indexed by type code"""
+    codes = list(dict.fromkeys(codes))
+    return pd.DataFrame([describe_type(code) for code in codes], index=pd.Index(codes, name='Container Type'),
+                        columns=TYPE_COLUMNS)
+
+
+# Precomputed for every CASP type code
+TYPE_TABLE = build_type_table(length + type_code for length in CASP_LENGTHS for type_code in CASP_TYPES)
+
+
+def lookup_types(types: pd.Series) -> pd.DataFrame:
+    """
+    Map container type codes to their attributes
+
+    The codes are converted to a categorical so the table is looked up once per
+    distinct code and broadcast to the records with the category codes.
+
+    Args:
+        types: 'Container Type' column of the records
+
+    Returns:
+        DataFrame with TYPE_COLUMNS aligned with types
+    """
+    categories = types.astype('category')
+    distinct = categories.cat.categories
+    known = distinct.isin(TYPE_TABLE.index)
+    table = pd.concat([TYPE_TABLE.reindex(distinct[known]), build_type_table(distinct[~known])])
+    table = table.reindex(distinct).astype({'Reefer': bool, 'Open Top': bool, 'Flat Rack': bool})
+
+    positions = categories.cat.codes.to_numpy()
+    return pd.DataFrame({column: table[column].to_numpy()[positions] for column in TYPE_COLUMNS},
+                        index=types.index)
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+from stowage import DECK_TIER_START
+
+DEFAULT_CRANES = 3
+# Gross crane productivity in moves per hour
+DEFAULT_MOVES_PER_HOUR = 25.0
+
+BAY_MOVE_COLUMNS = ['Bay', 'Deck Moves', 'Hold Moves', 'Moves', 'Crane']
+CRANE_COLUMNS = ['Crane', 'First Bay', 'Last Bay', 'Bays', 'Moves', 'Hours']
+
+
+def forty_foot_bay(bays: np.ndarray) -> np.ndarray:
+    """
+    Working bay of every slot bay: 20' bays are worked with the 40' bay they belong to
+
+    Bays come in 01/02/03, 05/06/07, ... groups, the even number being the 40' bay.
+    """
+    return (bays - 1) // 4 * 4 + 2
+
+
+def moves_per_bay(records: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count the moves of every working bay, split into deck and hold
+
+    Args:
+        records: Container records to be worked, with numeric 'Bay' and 'Tier'
+
+    Returns:
+        DataFrame with Bay, Deck Moves, Hold Moves and Moves, ordered by bay
+    """
+    placed = records[records['Bay'] > 0]
+    bays = forty_foot_bay(placed['Bay'].to_numpy())
+    on_deck = placed['Tier'].to_numpy() >= DECK_TIER_START
+
+    working_bays, bay_index = np.unique(bays, return_inverse=True)
+    deck_moves = np.bincount(bay_index, weights=on_deck, minlength=len(working_bays)).astype(int)
+    moves = np.bincount(bay_index, minlength=len(working_bays))
+    return pd.DataFrame({
+        'Bay': working_bays,
+        'Deck Moves': deck_moves,
+        'Hold Moves': moves - deck_moves,
+        'Moves': moves,
+    })
+
+
+def _split_bays(moves: np.ndarray, cranes: int) -> np.ndarray:
+    """
+    Split the bays into at most `cranes` runs of neighbouring bays with the smallest largest run
+
+    Cranes cannot pass each other, so every crane works a contiguous range of bays.
+    The largest run is found by bisecting the crane capacity; each capacity is
+    checked greedily with searchsorted over the cumulative moves.
+
+    Returns:
+        0-based crane number of every bay
+    """
+    cumulative = np.cumsum(moves)
+
+    def run_starts(capacity: int) -> list:
+        starts, start = [], 0
+        while start < len(moves):
+            starts.append(start)
+            done = cumulative[start - 1] if start else 0
+            start = int(np.searchsorted(cumulative, done + capacity, side='right'))
+        return starts
+
+    low, high = int(moves.max()), int(cumulative[-1])
+    while low < high:
+        capacity = (low + high) // 2
+        if len(run_starts(capacity)) <= cranes:
+            high = capacity
+        else:
+            low = capacity + 1
+
+    crane = np.zeros(len(moves), dtype=np.int64)
+    crane[run_starts(low)[1:]] = 1
+    return np.cumsum(crane)
+
+
+def crane_split(records: pd.DataFrame, cranes: int = DEFAULT_CRANES,
+                moves_per_hour: float = DEFAULT_MOVES_PER_HOUR) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Balance the moves of a plan across quay cranes
+
+    Args:
+        records: Container records to be worked, with numeric 'Bay' and 'Tier'
+        cranes: Number of quay cranes
+        moves_per_hour: Gross moves per hour of one crane
+
+    Returns:
+        Tuple of the moves per bay with the assigned crane and the workload per
+        crane; the longest crane time is the largest 'Hours'
+    """
+    if cranes < 1:
+        raise ValueError("cranes must be at least 1")
+
+    bay_moves = moves_per_bay(records)
+    if bay_moves.empty:
+        return pd.DataFrame(columns=BAY_MOVE_COLUMNS), pd.DataFrame(columns=CRANE_COLUMNS)
+    bay_moves['Crane'] = _split_bays(bay_moves['Moves'].to_numpy(), cranes) + 1
+
+    crane_moves = bay_moves.groupby('Crane').agg(
+        **{'First Bay': ('Bay', 'min'), 'Last Bay': ('Bay', 'max'), 'Bays': ('Bay', 'size'),
+           'Moves': ('Moves', 'sum')}
+    ).reset_index()
+    crane_moves['Hours'] = (crane_moves['Moves'] / moves_per_hour).round(2)
+    return bay_moves[BAY_MOVE_COLUMNS], crane_moves[CRANE_COLUMNS]
@@ -0,0 +1,70 @@
+import pandas as pd
+
+# Columns of the DG manifest sheet, container fields first
+MANIFEST_COLUMNS = [
+    'Line', 'Slot', 'Container Number', 'Operator Code', 'Container Type', 'Full/Empty', 'POL', 'POD',
+    'Weight', 'IMDG Index', 'Sub Index', 'Class', 'UN Number', 'Subsidiary Risk 1', 'Subsidiary Risk 2',
+    'Subsidiary Risk 3', 'Packing Group', 'Net Weight', 'Flash Point', 'Limited Quantity',
+    'Marine Pollutant'
+]
+
+# Class shown for containers whose IMDG index has no detail line
+UNKNOWN_CLASS = 'Unknown'
+
+
+def container_classes(records: pd.DataFrame, imdg: pd.DataFrame) -> pd.Series:
+    """
+    Map every container record to its IMDG class(es)
+
+    Args:
+        records: Container records with an 'IMDG Index' column
+        imdg: Decoded IMDG section (AscPlan.imdg)
+
+    Returns:
+        Series aligned with records: '' for non-DG containers, classes joined
+        with '/' for several detail lines ('3/6.1') and 'Unknown' when the
+        index has no detail line
+    """
+    classes_per_index = imdg.drop_duplicates(['IMDG Index', 'Class']).groupby('IMDG Index')['Class'].agg('/'.join)
+    classes = records['IMDG Index'].map(classes_per_index)
+    classes = classes.where(classes.notna(), UNKNOWN_CLASS)
+    return classes.where(records['IMDG Index'] != '', '')
+
+
+def build_dg_manifest(records: pd.DataFrame, imdg: pd.DataFrame) -> pd.DataFrame:
+    """
+    Hash join DG containers with their IMDG detail lines on the internal IMDG index
+
+    Returns:
+        DataFrame with one row per container and IMDG detail line
+    """
+    dg_records = records[records['IMDG Index'] != '']
+    manifest = dg_records.merge(imdg.drop(columns='Line'), on='IMDG Index', how='left')
+    manifest['Class'] = manifest['Class'].fillna(UNKNOWN_CLASS)
+    return manifest.reindex(columns=MANIFEST_COLUMNS)
+
+
+def summarize_by_class(records: pd.DataFrame, manifest: pd.DataFrame) -> pd.DataFrame:
+    """
+    Summarize DG containers per operation, operator and IMDG class
+
+    Args:
+        records: Classified records with 'Operation' and 'IMDG Class' columns
+        manifest: DG manifest from build_dg_manifest
+
+    Returns:
+        DataFrame with container quantity, gross weight and DG net weight per group
+    """
+    dg_records = records[records['IMDG Class'] != '']
+    group_columns = ['Operation', 'Operator Code', 'IMDG Class']
+    summary = dg_records.groupby(group_columns, sort=True).agg(
+        Quantity=('Weight', 'size'),
+        Weight=('Weight', 'sum')
+    )
+    net_weight = dg_records[group_columns + ['IMDG Index']].merge(
+        manifest.groupby('IMDG Index', as_index=False)['Net Weight'].sum(), on='IMDG Index', how='left'
+    ).groupby(group_columns)['Net Weight'].sum()
+    summary['Net DG Weight'] = net_weight.reindex(summary.index).fillna(0)
+    summary = summary.reset_index()
+    summary['Weight'] = summary['Weight'].round().astype(int)
+    return summary
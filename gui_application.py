@@ -0,0 +1,13 @@
+_gui_app = None
+
+
+def ensure_gui_application() -> None:
+    """
+    Create an offscreen QGuiApplication when there is none (command line runs)
+
+    QPainter needs one to draw text; call from the main thread.
+    """
+    global _gui_app
+    from PyQt5.QtGui import QGuiApplication
+    if QGuiApplication.instance() is None:
+        _gui_app = QGuiApplication(['', '-platform', 'offscreen'])
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable
+
+# ISO 6346 letter values (multiples of 11 are skipped)
+LETTER_VALUES = {
+    'A': 10, 'B': 12, 'C': 13, 'D': 14, 'E': 15, 'F': 16, 'G': 17, 'H': 18,
+    'I': 19, 'J': 20, 'K': 21, 'L': 23, 'M': 24, 'N': 25, 'O': 26, 'P': 27,
+    'Q': 28, 'R': 29, 'S': 30, 'T': 31, 'U': 32, 'V': 34, 'W': 35, 'X': 36,
+    'Y': 37, 'Z': 38
+}
+
+# Equipment category identifiers (U: freight container, J: detachable equipment, Z: trailer/chassis)
+CATEGORY_IDENTIFIERS = b'UJZ'
+
+CONTAINER_NUMBER_LENGTH = 11
+
+# Separators people type or paste inside container numbers ('MSCU 123456-7')
+_SEPARATORS = b' \t-/.'
+_SEPARATOR_CODES = np.frombuffer(_SEPARATORS, dtype=np.uint8)
+
+# Byte -> ISO 6346 value lookup table, -1 for characters that are not allowed
+_CHAR_VALUES = np.full(256, -1, dtype=np.int64)
+_CHAR_VALUES[ord('0'):ord('9') + 1] = np.arange(10)
+for _letter, _value in LETTER_VALUES.items():
+    _CHAR_VALUES[ord(_letter)] = _value
+
+# Position weights 2^0 .. 2^9 for the owner code, category and serial number
+_WEIGHTS = 2 ** np.arange(CONTAINER_NUMBER_LENGTH - 1, dtype=np.int64)
+
+
+def _normalize_bytes(values: Iterable[str]) -> np.ndarray:
+    """Encode container numbers to ASCII bytes without separators, upper case"""
+    if isinstance(values, (pd.Series, np.ndarray)):
+        # Fast path for columns that are already clean, such as plan records
+        try:
+            encoded = np.asarray(values, dtype=str).astype(bytes)
+        except UnicodeEncodeError:
+            encoded = None
+        if encoded is not None:
+            codes = encoded.view(np.uint8)
+            if not (np.isin(codes, _SEPARATOR_CODES).any() or ((codes >= ord('a')) & (codes <= ord('z'))).any()):
+                return encoded
+        # Plain lists iterate much faster than Series/array elements
+        values = values.tolist()
+    encoded = [str(value).encode('ascii', errors='replace').translate(None, _SEPARATORS).upper()
+               for value in values]
+    return np.array(encoded, dtype=bytes) if encoded else np.array([], dtype='S1')
+
+
+def normalize_container_numbers(values: Iterable[str]) -> np.ndarray:
+    """Normalize container numbers the same way the plan is matched (no spaces/dashes, upper case)"""
+    return _normalize_bytes(values).astype(str)
+
+
+def _to_code_matrix(encoded: np.ndarray) -> np.ndarray:
+    """Convert encoded container numbers to an (n, 11) uint8 matrix, NUL padded"""
+    fixed = encoded.astype(f'S{CONTAINER_NUMBER_LENGTH}')
+    return fixed.view(np.uint8).reshape(-1, CONTAINER_NUMBER_LENGTH)
+
+
+def validate_container_numbers(numbers: Iterable[str]) -> pd.DataFrame:
+    """
+    Validate owner code, category identifier, serial number and check digit of container numbers
+
+    Args:
+        numbers: Container numbers as typed, pasted or read from the plan
+
+    Returns:
+        DataFrame with 'Container', 'Valid', 'Reason' and 'Expected Check Digit' columns,
+        one row per input number in input order
+    """
+    encoded = _normalize_bytes(numbers)
+    codes = _to_code_matrix(encoded)
+    lengths = np.char.str_len(encoded)
+
+    is_letter = (codes >= ord('A')) & (codes <= ord('Z'))
+    is_digit = (codes >= ord('0')) & (codes <= ord('9'))
+
+    owner_ok = is_letter[:, :3].all(axis=1)
+    category_ok = np.isin(codes[:, 3], np.frombuffer(CATEGORY_IDENTIFIERS, dtype=np.uint8))
+    serial_ok = is_digit[:, 4:10].all(axis=1)
+
+    values = _CHAR_VALUES[codes[:, :CONTAINER_NUMBER_LENGTH - 1]]
+    expected = np.where(owner_ok & serial_ok, (values @ _WEIGHTS) % 11 % 10, -1)
+    actual = np.where(is_digit[:, 10], codes[:, 10].astype(np.int64) - ord('0'), -2)
+
+    reason = np.select(
+        [
+            lengths != CONTAINER_NUMBER_LENGTH,
+            ~owner_ok,
+            ~category_ok,
+            ~serial_ok,
+            expected != actual
+        ],
+        ['Length', 'Owner Code', 'Category', 'Serial Number', 'Check Digit'],
+        default=''
+    )
+
+    return pd.DataFrame({
+        'Container': encoded.astype(str),
+        'Valid': reason == '',
+        'Reason': reason,
+        'Expected Check Digit': np.where(expected >= 0, expected.astype(str), '')
+    })
@@ -0,0 +1,285 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+from container_types import lookup_types
+
+# Tiers 80 and up are on deck, lower tiers are in the hold
+DECK_TIER_START = 80
+
+# Marks an empty cell of the slot grid
+EMPTY_SLOT = -1
+
+# Stack heights are counted in high cube boxes (9'6"); unknown types count as standard (8'6")
+HIGH_CUBE_HEIGHT = 9.5
+STANDARD_HEIGHT = 8.5
+
+# Default stack weight limits in tons by (stack length, 'Deck'/'Hold'); override with the limits of the vessel
+DEFAULT_STACK_WEIGHT_LIMITS: Dict[Tuple[int, str], float] = {
+    (20, 'Deck'): 80.0, (40, 'Deck'): 120.0,
+    (20, 'Hold'): 180.0, (40, 'Hold'): 250.0,
+}
+
+RESTOW_COLUMNS = ['Line', 'Slot', 'Bay', 'Container Number', 'Operator Code', 'Container Type', 'Full/Empty',
+                  'Weight', 'POD', 'Blocked POD']
+
+STACK_COLUMNS = ['Bay', 'Row', 'Deck/Hold', 'Length', 'Containers', 'Weight', 'Height (HC)', 'Inversions',
+                 'Weight Limit', 'Overweight']
+
+
+class SlotGrid:
+    """
+    Dense bay x row x tier grid of the container records
+
+    Every cell holds the position (0-based, as used by DataFrame.iloc) of the
+    record stowed in that slot or EMPTY_SLOT. Records without a valid slot
+    are left out of the grid.
+    """
+
+    def __init__(self, records: pd.DataFrame):
+        """
+        Build the grid from the decoded slot of every record
+
+        Args:
+            records: Container records with numeric 'Bay', 'Row' and 'Tier' columns
+        """
+        self.bay_numbers = records['Bay'].to_numpy()
+        self.row_numbers = records['Row'].to_numpy()
+        self.tier_numbers = records['Tier'].to_numpy()
+        # Bays and tiers start at 01; row 00 is the centre line
+        self.placed = (self.bay_numbers > 0) & (self.tier_numbers > 0)
+
+        positions = np.flatnonzero(self.placed)
+        shape = tuple(int(values[positions].max()) + 1 if len(positions) else 1
+                      for values in (self.bay_numbers, self.row_numbers, self.tier_numbers))
+        self.cells = np.full(shape, EMPTY_SLOT, dtype=np.int64)
+        # Later records win when two records claim the same slot
+        self.cells[self.bay_numbers[positions], self.row_numbers[positions], self.tier_numbers[positions]] = positions
+
+    @property
+    def occupied(self) -> np.ndarray:
+        """Boolean bay x row x tier mask of occupied slots"""
+        return self.cells != EMPTY_SLOT
+
+    @property
+    def on_deck(self) -> np.ndarray:
+        """Boolean mask aligned with the records, True for deck stowage"""
+        return self.placed & (self.tier_numbers >= DECK_TIER_START)
+
+    @property
+    def bays(self) -> np.ndarray:
+        """Bay numbers with at least one container"""
+        return np.flatnonzero(self.occupied.any(axis=(1, 2)))
+
+    def record_at(self, bay: int, row: int, tier: int) -> int:
+        """Record position stowed in a slot, EMPTY_SLOT if the slot is empty or outside the grid"""
+        if not (0 <= bay < self.cells.shape[0] and 0 <= row < self.cells.shape[1]
+                and 0 <= tier < self.cells.shape[2]):
+            return EMPTY_SLOT
+        return int(self.cells[bay, row, tier])
+
+    def bay(self, bay: int, deck: bool = None) -> np.ndarray:
+        """
+        Record positions stowed in a bay, ordered by row and tier
+
+        Args:
+            bay: Bay number
+            deck: True for deck only, False for hold only, None for both
+        """
+        if not 0 <= bay < self.cells.shape[0]:
+            return np.array([], dtype=np.int64)
+        cells = self.cells[bay]
+        if deck is not None:
+            cells = cells[:, DECK_TIER_START:] if deck else cells[:, :DECK_TIER_START]
+        return cells[cells != EMPTY_SLOT]
+
+    def stack(self, bay: int, row: int, deck: bool = None) -> np.ndarray:
+        """Record positions of one row stack, bottom tier first"""
+        if not (0 <= bay < self.cells.shape[0] and 0 <= row < self.cells.shape[1]):
+            return np.array([], dtype=np.int64)
+        cells = self.cells[bay, row]
+        if deck is not None:
+            cells = cells[DECK_TIER_START:] if deck else cells[:DECK_TIER_START]
+        return cells[cells != EMPTY_SLOT]
+
+
+def stack_report(records: pd.DataFrame, grid: SlotGrid,
+                 weight_limits: Dict[Tuple[int, str], float] = None) -> pd.DataFrame:
+    """
+    Weight, height and weight inversions of every row stack in every bay
+
+    40' boxes (even bays) are folded into the 20' bays on either side, as in
+    find_restows. When either half of a 40' box stands over a 20' box, the box
+    adds half its weight to both 20' bay stacks (Length '20/40'), so a stack
+    is reported even when its only boxes are 40' halves. The boxes of a 40'
+    bay stack without 20' boxes under either half are reported once as a 40'
+    stack at full weight.
+
+    The entries are sorted in bay, row, deck/hold, tier order, so each stack
+    is a contiguous run and every figure is a single np.add.reduceat over the runs.
+
+    Args:
+        records: Container records the grid was built from, with 'Weight' in tons
+        grid: Slot grid of the records
+        weight_limits: Stack weight limit in tons by (20 or 40, 'Deck' or 'Hold');
+            mixed stacks take the 20' limit (optional, defaults to DEFAULT_STACK_WEIGHT_LIMITS)
+
+    Returns:
+        DataFrame with one row per stack; Inversions counts boxes bearing more
+        weight on the stack than the box directly below them
+    """
+    weight_limits = weight_limits or DEFAULT_STACK_WEIGHT_LIMITS
+    bay_numbers, row_numbers, tier_numbers = np.nonzero(grid.occupied)
+    if not len(bay_numbers):
+        return pd.DataFrame(columns=STACK_COLUMNS)
+
+    positions = grid.cells[bay_numbers, row_numbers, tier_numbers]
+    deck = tier_numbers >= DECK_TIER_START
+    weights = records['Weight'].to_numpy(dtype=float)[positions]
+    heights = lookup_types(records['Container Type'])['Height'].to_numpy(dtype=float)[positions]
+    heights = np.where(np.isnan(heights), STANDARD_HEIGHT, heights)
+
+    # 20' bay stacks holding a 20' box
+    is_forty = bay_numbers % 2 == 0
+    has_twenty = np.zeros((grid.cells.shape[0] + 2, grid.cells.shape[1], 2), dtype=bool)
+    has_twenty[bay_numbers[~is_forty], row_numbers[~is_forty], deck[~is_forty].astype(int)] = True
+    forty = np.flatnonzero(is_forty)
+    before = has_twenty[bay_numbers[forty] - 1, row_numbers[forty], deck[forty].astype(int)]
+    after = has_twenty[bay_numbers[forty] + 1, row_numbers[forty], deck[forty].astype(int)]
+    pure_forty = forty[~before & ~after]
+    mixed_forty = forty[before | after]
+
+    # Stack entries: 20' boxes, 40' boxes in 40' stacks, both halves of the other 40' boxes
+    twenty = np.flatnonzero(~is_forty)
+    entries = np.concatenate([twenty, pure_forty, mixed_forty, mixed_forty])
+    stack_bays = np.concatenate([bay_numbers[twenty], bay_numbers[pure_forty],
+                                 bay_numbers[mixed_forty] - 1, bay_numbers[mixed_forty] + 1])
+    shares = np.concatenate([np.ones(len(twenty) + len(pure_forty)), np.full(2 * len(mixed_forty), 0.5)])
+    row_numbers, tier_numbers, deck = row_numbers[entries], tier_numbers[entries], deck[entries]
+    loads = weights[entries] * shares
+    heights = heights[entries]
+    box_forty = is_forty[entries]
+
+    order = np.lexsort((tier_numbers, deck, row_numbers, stack_bays))
+    stack_bays, row_numbers, deck = stack_bays[order], row_numbers[order], deck[order]
+    loads, heights, box_forty = loads[order], heights[order], box_forty[order]
+
+    # A new stack starts where bay, row or deck/hold changes
+    new_stack = np.ones(len(order), dtype=bool)
+    new_stack[1:] = ((stack_bays[1:] != stack_bays[:-1]) | (row_numbers[1:] != row_numbers[:-1])
+                     | (deck[1:] != deck[:-1]))
+    starts = np.flatnonzero(new_stack)
+    inverted = np.zeros(len(order), dtype=np.int64)
+    inverted[1:] = ~new_stack[1:] & (loads[1:] > loads[:-1])
+    forty_count = np.add.reduceat(box_forty.astype(np.int64), starts)
+
+    report = pd.DataFrame({
+        'Bay': stack_bays[starts],
+        'Row': row_numbers[starts],
+        'Deck/Hold': np.where(deck[starts], 'Deck', 'Hold'),
+        'Length': np.where(stack_bays[starts] % 2 == 0, '40', np.where(forty_count > 0, '20/40', '20')),
+        'Containers': np.diff(np.append(starts, len(order))),
+        'Weight': np.add.reduceat(loads, starts).round(1),
+        'Height (HC)': (np.add.reduceat(heights, starts) / HIGH_CUBE_HEIGHT).round(2),
+        'Inversions': np.add.reduceat(inverted, starts),
+    })
+    limit_length = np.where(report['Length'] == '40', 40, 20)
+    report['Weight Limit'] = [weight_limits.get((length, deck_hold))
+                              for length, deck_hold in zip(limit_length, report['Deck/Hold'])]
+    report['Overweight'] = np.where(report['Weight'] > report['Weight Limit'], 'Yes', 'No')
+    return report[STACK_COLUMNS]
+
+
+def discharge_ranks(pods: pd.Series, rotation: List[str], terminal_port: str) -> np.ndarray:
+    """
+    Rank the POD of every record in call order
+
+    Args:
+        pods: 'POD' column of the records (three-letter port codes)
+        rotation: Port rotation from the plan header
+        terminal_port: UN/LOCODE of the terminal ('KRPUS')
+
+    Returns:
+        Rank of each POD counted cyclically from the terminal (rank 0), so ports
+        before the terminal in the rotation are called on the next voyage; a
+        terminal missing from the rotation still comes first. Ports not in the
+        rotation rank last. Without a rotation only the terminal is known to
+        come first (rank 0, others 1).
+    """
+    port_code = terminal_port[-3:]
+    if not rotation:
+        return np.where(pods.to_numpy() == port_code, 0, 1)
+    ports = list(dict.fromkeys(rotation))
+    if port_code in ports:
+        start = ports.index(port_code)
+        ports = ports[start:] + ports[:start]
+    else:
+        ports = [port_code] + ports
+    rank = {port: rank for rank, port in enumerate(ports)}
+    return pods.map(rank).fillna(len(rank)).to_numpy(dtype=np.int64)
+
+
+def find_restows(records: pd.DataFrame, grid: SlotGrid, pod_ranks: np.ndarray) -> pd.DataFrame:
+    """
+    Find containers stowed above a container for an earlier port
+
+    Each stack is a (20' bay, row) column from the bottom hold tier to the top
+    deck tier, since the hatch cover must come off to reach the hold. 40' boxes
+    in even bays stand in both 20' bays they cover. A box must be restowed when
+    its POD rank is later than the earliest POD rank anywhere below it.
+
+    Args:
+        records: Container records the grid was built from
+        grid: Slot grid of the records
+        pod_ranks: Call order of each record's POD (discharge_ranks)
+
+    Returns:
+        DataFrame of the boxes to restow with the earliest POD blocked below them
+    """
+    bay_numbers, row_numbers, tier_numbers = np.nonzero(grid.occupied)
+    positions = grid.cells[bay_numbers, row_numbers, tier_numbers]
+
+    # 40' boxes stand in the 20' bays on either side of their even bay
+    is_forty = bay_numbers % 2 == 0
+    bay_numbers = np.concatenate([np.where(is_forty, bay_numbers - 1, bay_numbers), bay_numbers[is_forty] + 1])
+    row_numbers = np.concatenate([row_numbers, row_numbers[is_forty]])
+    tier_numbers = np.concatenate([tier_numbers, tier_numbers[is_forty]])
+    positions = np.concatenate([positions, positions[is_forty]])
+    order = np.lexsort((tier_numbers, row_numbers, bay_numbers))
+    bay_numbers, row_numbers, positions = bay_numbers[order], row_numbers[order], positions[order]
+    if not len(positions):
+        return pd.DataFrame(columns=RESTOW_COLUMNS)
+
+    new_stack = np.ones(len(positions), dtype=bool)
+    new_stack[1:] = (bay_numbers[1:] != bay_numbers[:-1]) | (row_numbers[1:] != row_numbers[:-1])
+    ranks = pod_ranks[positions]
+
+    # Running minimum per stack: shifting every stack below the previous ones makes
+    # one minimum.accumulate restart at each stack
+    offset = (np.cumsum(new_stack) - 1) * (int(ranks.max()) + 1)
+    lowest = np.minimum.accumulate(ranks - offset) + offset
+    lowest_below = np.empty_like(lowest)
+    lowest_below[0] = 0
+    lowest_below[1:] = lowest[:-1]
+    lowest_below[new_stack] = ranks[new_stack]
+    is_restow = ranks > lowest_below
+
+    # Back to one row per record, 40' boxes report the earliest POD under either half
+    n = len(records)
+    record_restow = np.zeros(n, dtype=bool)
+    record_restow[positions[is_restow]] = True
+    blocked_rank = np.full(n, np.iinfo(np.int64).max)
+    np.minimum.at(blocked_rank, positions[is_restow], lowest_below[is_restow])
+
+    port_of_rank = dict(zip(pod_ranks, records['POD']))
+    restows = records[record_restow].assign(
+        **{'Blocked POD': [port_of_rank[rank] for rank in blocked_rank[record_restow]]}
+    )
+    return restows[RESTOW_COLUMNS].reset_index(drop=True)
+
+
+def restows_by_bay(restows: pd.DataFrame) -> pd.DataFrame:
+    """Restow count per bay; each restow costs a discharge and a reload move"""
+    counts = restows.groupby('Bay').size().rename('Restows').reset_index()
+    counts['Extra Moves'] = counts['Restows'] * 2
+    return counts
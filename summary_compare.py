@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from typing import List
+
+# Group key of the billing summary sheets
+SUMMARY_KEY = [
+    'Operation', 'Container Type', 'Full/Empty', 'Operator Code', 'OOG', 'Damaged', 'IMO', 'SOC',
+    'Coastal Cargo', 'To Rail', 'To Barge', 'To TPF', 'To Truck', 'Not for MSC Account'
+]
+SUMMARY_VALUES = ['Quantity', 'Weight']
+
+# Summary weights are rounded to whole tons per group, so sums of groups may differ by a ton
+DEFAULT_WEIGHT_TOLERANCE = 1.0
+
+COMPARISON_COLUMNS = SUMMARY_KEY + ['Status', 'Expected Quantity', 'Computed Quantity', 'Quantity Difference',
+                                    'Expected Weight', 'Computed Weight', 'Weight Difference']
+
+
+def read_summary_workbook(file_path: str) -> pd.DataFrame:
+    """
+    Read the summary sheets of an existing summary workbook
+
+    The workbook is opened read-only and every sheet named 'Summary' or
+    'Summary <operator>' is read.
+
+    Returns:
+        Summary rows with the SUMMARY_KEY columns as stripped strings and
+        numeric Quantity and Weight
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        frames = []
+        for worksheet in workbook.worksheets:
+            if worksheet.title != 'Summary' and not worksheet.title.startswith('Summary '):
+                continue
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            frame = pd.DataFrame(list(rows), columns=[str(column).strip() if column else '' for column in header])
+            missing = [column for column in SUMMARY_KEY + SUMMARY_VALUES if column not in frame.columns]
+            if missing:
+                raise ValueError(f"Sheet '{worksheet.title}' of {file_path} has no {', '.join(missing)} column")
+            frames.append(frame[SUMMARY_KEY + SUMMARY_VALUES])
+    finally:
+        workbook.close()
+
+    if not frames:
+        raise ValueError(f"No Summary sheet in {file_path}")
+    summary = pd.concat(frames, ignore_index=True).dropna(how='all')
+    summary[SUMMARY_KEY] = summary[SUMMARY_KEY].fillna('').astype(str).apply(lambda column: column.str.strip())
+    for column in SUMMARY_VALUES:
+        summary[column] = pd.to_numeric(summary[column], errors='coerce').fillna(0)
+    return summary
+
+
+def _group(summary: pd.DataFrame) -> pd.DataFrame:
+    """Add up quantity and weight per SUMMARY_KEY group (summaries may split groups further, e.g. by POL/POD)"""
+    return summary.groupby(SUMMARY_KEY, sort=False)[SUMMARY_VALUES].sum()
+
+
+def compare_summaries(expected: pd.DataFrame, computed: pd.DataFrame, operators: List[str] = None,
+                      weight_tolerance: float = DEFAULT_WEIGHT_TOLERANCE) -> pd.DataFrame:
+    """
+    Hash join an existing summary with the computed summary on the SUMMARY_KEY groups
+
+    Args:
+        expected: Summary rows of the existing workbook (read_summary_workbook)
+        computed: Summary rows computed from the plan (ContainerAnalyzer.process_file)
+        operators: Operator codes to compare (optional, defaults to the operators
+            of the existing summary, so partner operators it does not bill are left out)
+        weight_tolerance: Largest weight difference in tons still reported as a match
+
+    Returns:
+        DataFrame with one row per group that is missing on either side or
+        differs in quantity or weight beyond the tolerance
+    """
+    if operators is None:
+        operators = pd.unique(expected['Operator Code'])
+    computed = computed[computed['Operator Code'].isin(operators)]
+
+    joined = _group(expected).join(_group(computed), how='outer', lsuffix=' Expected', rsuffix=' Computed')
+    in_expected = joined['Quantity Expected'].notna().to_numpy()
+    in_computed = joined['Quantity Computed'].notna().to_numpy()
+
+    report = pd.DataFrame({
+        'Expected Quantity': joined['Quantity Expected'].fillna(0).astype(int),
+        'Computed Quantity': joined['Quantity Computed'].fillna(0).astype(int),
+        'Expected Weight': joined['Weight Expected'].fillna(0).round(1),
+        'Computed Weight': joined['Weight Computed'].fillna(0).round(1),
+    }, index=joined.index)
+    report['Quantity Difference'] = report['Computed Quantity'] - report['Expected Quantity']
+    report['Weight Difference'] = (report['Computed Weight'] - report['Expected Weight']).round(1)
+
+    quantity_mismatch = report['Quantity Difference'].to_numpy() != 0
+    weight_mismatch = np.abs(report['Weight Difference'].to_numpy()) > weight_tolerance
+    report['Status'] = np.select(
+        [~in_computed, ~in_expected, quantity_mismatch & weight_mismatch, quantity_mismatch, weight_mismatch],
+        ['Not in plan', 'Not in workbook', 'Quantity and weight mismatch', 'Quantity mismatch', 'Weight mismatch'],
+        default=''
+    )
+    report = report[report['Status'] != ''].reset_index()
+    return report[COMPARISON_COLUMNS]
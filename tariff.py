@@ -0,0 +1,138 @@
+import os
+import numpy as np
+import pandas as pd
+
+from container_types import lookup_types
+
+# Tariff key columns; a blank or '*' value in the tariff matches any value
+TARIFF_KEY = ['Operation', 'Size', 'Container Type', 'Full/Empty', 'OOG', 'IMO', 'To TPF', 'To Truck']
+WILDCARD = '*'
+
+# What a rate is charged per: container, TEU or ton of cargo weight
+TARIFF_UNITS = {'Box': 'Quantity', 'TEU': 'TEU', 'Ton': 'Weight'}
+DEFAULT_UNIT = 'Box'
+
+CHARGE_COLUMNS = ['Operation', 'POL', 'POD', 'Container Type', 'Full/Empty', 'Operator Code', 'OOG', 'IMO',
+                  'To TPF', 'To Truck', 'Quantity', 'TEU', 'Weight', 'Tariff Row', 'Description', 'Unit', 'Rate',
+                  'Billed Units', 'Amount']
+
+
+def read_tariff(file_path: str) -> pd.DataFrame:
+    """
+    Read a tariff table from a CSV or YAML file
+
+    CSV files have a header row with any of the TARIFF_KEY columns plus 'Rate'
+    and optionally 'Unit' (Box, TEU or Ton) and 'Description'. YAML files hold
+    the same rows as a list of mappings, either at the top level or under a
+    'tariff' key (needs PyYAML).
+
+    Returns:
+        DataFrame with normalized key columns, numeric Rate and a 1-based 'Tariff Row'
+    """
+    if os.path.splitext(file_path)[1].lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Reading YAML tariffs needs PyYAML (pip install pyyaml)")
+        with open(file_path, encoding='utf-8') as f:
+            data = yaml.safe_load(f) or []
+        rows = data.get('tariff', []) if isinstance(data, dict) else data
+        tariff = pd.DataFrame(rows, dtype=object)
+    else:
+        tariff = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+
+    tariff.columns = [str(column).strip() for column in tariff.columns]
+    if 'Rate' not in tariff.columns:
+        raise ValueError(f"Tariff needs a 'Rate' column: {file_path}")
+    tariff['Tariff Row'] = np.arange(1, len(tariff) + 1)
+
+    for column in TARIFF_KEY:
+        values = tariff[column].fillna('').astype(str).str.strip().str.upper() if column in tariff else ''
+        tariff[column] = pd.Series(values, index=tariff.index).replace(WILDCARD, '')
+    # Sizes written as numbers ('40.0' from YAML floats) compare as whole feet
+    tariff['Size'] = tariff['Size'].str.replace(r'\.0+$', '', regex=True)
+
+    rates = pd.to_numeric(tariff['Rate'], errors='coerce')
+    if rates.isna().any():
+        bad_rows = tariff.loc[rates.isna(), 'Tariff Row'].tolist()
+        raise ValueError(f"Tariff rows {bad_rows} have no numeric Rate: {file_path}")
+    tariff['Rate'] = rates.astype(float)
+
+    units = tariff['Unit'].fillna('').astype(str).str.strip() if 'Unit' in tariff else pd.Series('', index=tariff.index)
+    tariff['Unit'] = units.replace('', DEFAULT_UNIT).str.capitalize().replace('Teu', 'TEU')
+    unknown = sorted(set(tariff['Unit']) - set(TARIFF_UNITS))
+    if unknown:
+        raise ValueError(f"Unknown tariff unit {', '.join(unknown)} (use {', '.join(TARIFF_UNITS)}): {file_path}")
+    tariff['Description'] = tariff['Description'].fillna('').astype(str) if 'Description' in tariff else ''
+    return tariff[TARIFF_KEY + ['Rate', 'Unit', 'Description', 'Tariff Row']]
+
+
+def _tariff_keys(summary: pd.DataFrame) -> pd.DataFrame:
+    """Key columns of the summary groups normalized like the tariff, with the group position as 'Group'"""
+    lengths = lookup_types(summary['Container Type'])['Length']
+    keys = pd.DataFrame({
+        column: summary[column].astype(str).str.strip().str.upper()
+        for column in TARIFF_KEY if column != 'Size'
+    })
+    keys['Size'] = np.where(lengths.notna(), lengths.fillna(0).astype(int).astype(str), '')
+    keys['Group'] = np.arange(len(summary))
+    return keys
+
+
+def apply_tariff(summary: pd.DataFrame, tariff: pd.DataFrame) -> pd.DataFrame:
+    """
+    Price every summary group with the most specific matching tariff row
+
+    Tariff rows are grouped by which key columns they set; each group is
+    matched with one merge on those columns. Of several matching rows the one
+    setting the most key columns wins, then the first in the file.
+
+    Args:
+        summary: Summary groups (ContainerAnalyzer.process_file)
+        tariff: Tariff table from read_tariff
+
+    Returns:
+        DataFrame with one row per summary group in CHARGE_COLUMNS; groups
+        without a matching tariff row have no Tariff Row and an Amount of 0
+    """
+    keys = _tariff_keys(summary)
+    specified = tariff[TARIFF_KEY] != ''
+    tariff = tariff.assign(Specificity=specified.sum(axis=1).to_numpy())
+
+    matches = []
+    for pattern, rows in tariff.groupby([specified[column] for column in TARIFF_KEY], sort=False):
+        columns = [column for column, is_set in zip(TARIFF_KEY, pattern) if is_set]
+        rows = rows.drop(columns=[column for column in TARIFF_KEY if column not in columns])
+        if columns:
+            matched = keys[columns + ['Group']].merge(rows, on=columns, how='inner')
+        else:
+            matched = keys[['Group']].merge(rows, how='cross')
+        matches.append(matched[['Group', 'Specificity', 'Tariff Row', 'Description', 'Unit', 'Rate']])
+
+    best = pd.concat(matches, ignore_index=True) if matches else pd.DataFrame(
+        columns=['Group', 'Specificity', 'Tariff Row', 'Description', 'Unit', 'Rate'])
+    best = best.sort_values(['Specificity', 'Tariff Row'], ascending=[False, True]).drop_duplicates('Group')
+    best = best.set_index('Group').reindex(np.arange(len(summary)))
+
+    charges = summary.reset_index(drop=True).copy()
+    charges['Tariff Row'] = best['Tariff Row'].astype('Int64').to_numpy()
+    charges['Description'] = best['Description'].fillna('').to_numpy()
+    charges['Unit'] = best['Unit'].fillna('').to_numpy()
+    charges['Rate'] = best['Rate'].astype(float).to_numpy()
+
+    billed = np.zeros(len(charges))
+    for unit, column in TARIFF_UNITS.items():
+        is_unit = (charges['Unit'] == unit).to_numpy()
+        billed[is_unit] = charges.loc[is_unit, column].to_numpy(dtype=float)
+    charges['Billed Units'] = billed
+    charges['Amount'] = (billed * charges['Rate'].fillna(0)).round(2)
+    return charges[CHARGE_COLUMNS]
+
+
+def charges_with_total(charges: pd.DataFrame) -> pd.DataFrame:
+    """Charges followed by a 'Total' row with the quantities and amount of the call"""
+    total = {'Operation': 'Total'}
+    total.update({column: charges[column].sum() for column in ['Quantity', 'TEU', 'Weight', 'Amount']})
+    with_total = pd.concat([charges, pd.DataFrame([total])], ignore_index=True)
+    return with_total.astype({'Tariff Row': 'Int64'})[CHARGE_COLUMNS]
+
@@ -0,0 +1,14 @@
+import pytest
+
+from classification_rules import ClassificationRules
+
+
+def test_default_rules_assign_required_columns():
+    rules = ClassificationRules.from_file()
+
+    assert {'Exclude', 'Operation', 'To TPF', 'To Truck'} <= set(rules.columns)
+
+
+def test_rules_missing_required_column_name_it():
+    with pytest.raises(ValueError, match='Exclude, To TPF, To Truck'):
+        ClassificationRules.from_text('Operation = DIS\n')
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from stowage import SlotGrid, discharge_ranks, find_restows, stack_report
+
+
+def _records(rows):
+    """Container records from (bay, row, tier, weight, ISO type) tuples"""
+    return pd.DataFrame(rows, columns=['Bay', 'Row', 'Tier', 'Weight', 'Container Type'])
+
+
+def test_stack_report_folds_forty_over_one_twenty_half_into_both_bays():
+    # A 20' box only under the bay 01 half of two 40' boxes
+    records = _records([(1, 1, 2, 10.0, '22G1'), (2, 1, 4, 30.0, '45G1'), (2, 1, 6, 30.0, '45G1')])
+    report = stack_report(records, SlotGrid(records)).set_index('Bay')
+
+    assert list(report.index) == [1, 3]
+    assert report.loc[1, 'Weight'] == 40.0
+    assert report.loc[3, 'Weight'] == 30.0
+    assert report['Weight'].sum() == 70.0
+    assert set(report['Length']) == {'20/40'}
+
+
+def test_stack_report_keeps_pure_forty_stack_whole():
+    records = _records([(2, 1, 82, 20.0, '45G1'), (2, 1, 84, 25.0, '45G1')])
+    report = stack_report(records, SlotGrid(records))
+
+    assert len(report) == 1
+    assert report.loc[0, 'Bay'] == 2
+    assert report.loc[0, 'Length'] == '40'
+    assert report.loc[0, 'Weight'] == 45.0
+
+
+def test_discharge_ranks_count_from_mid_rotation_terminal():
+    pods = pd.Series(['PUS', 'LGB', 'NGB', 'SHA', 'XXX'])
+    ranks = discharge_ranks(pods, ['NGB', 'SHA', 'PUS', 'LGB'], 'KRPUS')
+
+    assert ranks.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_discharge_ranks_terminal_missing_from_rotation_comes_first():
+    pods = pd.Series(['PUS', 'NGB', 'LGB'])
+    ranks = discharge_ranks(pods, ['NGB', 'SHA', 'LGB'], 'KRPUS')
+
+    assert ranks.tolist() == [0, 1, 3]
+
+
+def test_find_restows_terminal_box_over_next_voyage_port():
+    # A PUS box over an NGB box is discharged first with a mid-rotation terminal
+    records = _records([(1, 1, 2, 20.0, '22G1'), (1, 1, 4, 20.0, '22G1')]).assign(
+        Line=[1, 2], Slot=['010102', '010104'], **{'Container Number': ['A', 'B'], 'Operator Code': 'MSC',
+                                                   'Full/Empty': 'F', 'POD': ['NGB', 'PUS']})
+    ranks = discharge_ranks(records['POD'], ['NGB', 'SHA', 'PUS', 'LGB'], 'KRPUS')
+    assert find_restows(records, SlotGrid(records), ranks).empty
+
+    records['POD'] = ['PUS', 'NGB']
+    ranks = discharge_ranks(records['POD'], ['NGB', 'SHA', 'PUS', 'LGB'], 'KRPUS')
+    restows = find_restows(records, SlotGrid(records), ranks)
+    assert restows['Container Number'].tolist() == ['B']
+    assert restows['Blocked POD'].tolist() == ['PUS']
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from gui_application import ensure_gui_application
+from stowage import DECK_TIER_START, SlotGrid
+
+# Longitudinal distance between consecutive bay numbers in meters (a 20' bay is two numbers)
+DEFAULT_BAY_SPACING = 3.25
+
+WEIGHT_COLUMNS = ['Bay', 'LCG', 'Deck Weight', 'Hold Weight', 'Weight', 'Share', 'Moment']
+
+# Chart size in pixels
+CHART_WIDTH = 1200
+CHART_HEIGHT = 500
+
+_chart_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def read_bay_positions(file_path: str) -> pd.Series:
+    """
+    Read a bay position table (CSV with 'Bay' and 'LCG' columns)
+
+    LCG is the longitudinal center of gravity of the bay in meters forward of
+    midship (negative aft).
+
+    Returns:
+        LCG indexed by bay number
+    """
+    table = pd.read_csv(file_path)
+    if not {'Bay', 'LCG'} <= set(table.columns):
+        raise ValueError(f"Bay position table needs 'Bay' and 'LCG' columns: {file_path}")
+    return table.set_index('Bay')['LCG'].astype(float)
+
+
+def default_bay_positions(bays: np.ndarray) -> pd.Series:
+    """Estimate bay positions when no table is given: evenly spaced, bay 01 forward, centered on the used bays"""
+    middle = (bays.min() + bays.max()) / 2 if len(bays) else 0
+    return pd.Series((middle - bays) * DEFAULT_BAY_SPACING, index=bays, dtype=float)
+
+
+def weight_distribution(records: pd.DataFrame, grid: SlotGrid, bay_positions: pd.Series = None) -> pd.DataFrame:
+    """
+    Tonnage per bay split into deck and hold, with the longitudinal moment of every bay
+
+    Args:
+        records: Container records the grid was built from, with 'Weight' in tons
+        grid: Slot grid of the records
+        bay_positions: LCG per bay from read_bay_positions (optional, estimated
+            with default_bay_positions when omitted; bays missing from the table
+            are estimated as well)
+
+    Returns:
+        DataFrame with one row per used bay; Share is the bay's part of the
+        total weight and Moment the weight times LCG in ton-meters
+    """
+    occupied = grid.occupied
+    # Empty cells (-1) pick the trailing 0
+    weights = np.append(records['Weight'].to_numpy(dtype=float), 0.0)[grid.cells]
+    deck_weight = weights[:, :, DECK_TIER_START:].sum(axis=(1, 2))
+    hold_weight = weights[:, :, :DECK_TIER_START].sum(axis=(1, 2))
+
+    bays = np.flatnonzero(occupied.any(axis=(1, 2)))
+    positions = default_bay_positions(bays)
+    if bay_positions is not None:
+        positions = bay_positions.reindex(bays).fillna(positions)
+
+    report = pd.DataFrame({
+        'Bay': bays,
+        'LCG': positions.to_numpy(),
+        'Deck Weight': deck_weight[bays].round(1),
+        'Hold Weight': hold_weight[bays].round(1),
+    })
+    total = deck_weight[bays] + hold_weight[bays]
+    report['Weight'] = total.round(1)
+    report['Share'] = (total / total.sum()).round(4) if total.sum() else 0.0
+    report['Moment'] = (total * report['LCG']).round(1)
+    return report[WEIGHT_COLUMNS]
+
+
+def cargo_lcg(distribution: pd.DataFrame) -> Optional[float]:
+    """Longitudinal center of gravity of the cargo in meters forward of midship, None for an empty plan"""
+    total = distribution['Weight'].sum()
+    return float(distribution['Moment'].sum() / total) if total else None
+
+
+def render_weight_chart(distribution: pd.DataFrame, file_path: str) -> str:
+    """
+    Draw the deck and hold tonnage per bay as a stacked bar chart and save it as PNG
+
+    Uses QImage/QPainter, which may paint outside the GUI thread.
+    """
+    from PyQt5.QtCore import QRectF, Qt
+    from PyQt5.QtGui import QColor, QImage, QPainter
+
+    image = QImage(CHART_WIDTH, CHART_HEIGHT, QImage.Format_ARGB32)
+    image.fill(QColor('white'))
+    painter = QPainter(image)
+    try:
+        margin = 50
+        plot_width = CHART_WIDTH - 2 * margin
+        plot_height = CHART_HEIGHT - 2 * margin
+        max_weight = distribution['Weight'].max() if len(distribution) else 0
+        scale = plot_height / max_weight if max_weight else 0
+        bar_width = plot_width / max(len(distribution), 1)
+
+        painter.drawText(QRectF(0, 0, CHART_WIDTH, margin), Qt.AlignCenter,
+                         f'Weight per bay (t), max {max_weight:,.1f} t  -  hold / deck')
+        painter.drawLine(margin, CHART_HEIGHT - margin, CHART_WIDTH - margin, CHART_HEIGHT - margin)
+        bars = zip(distribution['Bay'], distribution['Deck Weight'], distribution['Hold Weight'])
+        for i, (bay, deck_weight, hold_weight) in enumerate(bars):
+            x = margin + i * bar_width
+            hold_height = hold_weight * scale
+            deck_height = deck_weight * scale
+            base = CHART_HEIGHT - margin
+            painter.fillRect(QRectF(x + 2, base - hold_height, bar_width - 4, hold_height), QColor('#4a6fa5'))
+            painter.fillRect(QRectF(x + 2, base - hold_height - deck_height, bar_width - 4, deck_height),
+                             QColor('#f0a04b'))
+            painter.drawText(QRectF(x, base + 5, bar_width, margin - 10), Qt.AlignHCenter | Qt.AlignTop,
+                             f'{bay:02d}')
+    finally:
+        painter.end()
+
+    if not image.save(file_path, 'PNG'):
+        raise IOError(f"Could not save chart: {file_path}")
+    return file_path
+
+
+def start_weight_chart(distribution: pd.DataFrame, file_path: str) -> Future:
+    """
+    Render the weight chart on a background thread, call from the main thread
+
+    Returns:
+        Future resolving to the chart file path
+    """
+    ensure_gui_application()
+    return _chart_executor.submit(render_weight_chart, distribution.copy(), file_path)